@@ -0,0 +1,265 @@
+# 핸드 히스토리 로그 스트리밍 분석 파이프라인
+#
+# hand_log 세그먼트를 고정 크기 청크(mmap 뷰)로 나눠 제너레이터로 흘려보내고, 청크마다 벡터 연산으로
+# 시작 핸드별 승률/손익, 쇼다운 족보 분포, 스트리트별 에퀴티 대 실제 결과를 집계한 뒤 누적 결과에 병합한다.
+# 청크는 선택적으로 프로세스 풀에서 처리하며, 처리한 위치와 누적 결과를 체크포인트로 저장해 중단된 분석을 이어서 할 수 있다.
+# 메모리 사용량은 로그 크기와 무관하게 청크 크기에만 비례한다.
+#
+# 사용법: python analytics.py hands.hhl [--workers 4] [--checkpoint stats.ckpt] [--output stats.json]
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from equity import _CHUNK, FILLER_HAND, evaluate_cards, sample_runouts, share_matrix
+from evaluator import CATEGORY_NAMES
+from hand_log import NO_CARD, NO_SHOWDOWN, log_segments, read_log
+from preflop import NUM_CLASSES, class_name, hand_classes
+
+CHUNK_RECORDS = 65536  # 청크 하나의 레코드 수
+EQUITY_SAMPLES = 16  # 쇼다운 핸드마다 스트리트별 에퀴티를 추정할 때 뽑는 남은 보드 수
+EQUITY_BINS = 10  # 에퀴티 대 실제 결과 보정 구간 수
+STREETS = ("preflop", "flop", "turn")
+_STREET_CARDS = (0, 3, 4)  # 스트리트별 공개된 보드 카드 수
+
+
+class LogStats:
+    def __init__(self):
+        self.hands = 0  # 집계한 핸드 수
+        self.showdowns = 0  # 쇼다운까지 간 핸드 수
+        self.winning_category_counts = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)  # 이긴 핸드의 족보별 빈도
+        self.class_dealt = np.zeros(NUM_CLASSES, dtype=np.int64)  # 시작 핸드 클래스별 배분 횟수
+        self.class_wins = np.zeros(NUM_CLASSES)  # 시작 핸드 클래스별 가져간 팟 (무승부는 나눠 가짐)
+        self.class_net = np.zeros(NUM_CLASSES)  # 시작 핸드 클래스별 손익 합계 (가져간 팟 - 베팅)
+        self.bin_counts = np.zeros((len(STREETS), EQUITY_BINS), dtype=np.int64)  # 스트리트 x 에퀴티 구간별 좌석 수
+        self.bin_equity = np.zeros((len(STREETS), EQUITY_BINS))  # 구간별 추정 에퀴티 합계
+        self.bin_actual = np.zeros((len(STREETS), EQUITY_BINS))  # 구간별 실제로 가져간 몫 합계
+        self.position = (-1, 0)  # 체크포인트: (세그먼트 번호, 다음에 읽을 레코드 위치)
+
+    def merge(self, other):
+        self.hands += other.hands
+        self.showdowns += other.showdowns
+        self.winning_category_counts += other.winning_category_counts
+        self.class_dealt += other.class_dealt
+        self.class_wins += other.class_wins
+        self.class_net += other.class_net
+        self.bin_counts += other.bin_counts
+        self.bin_equity += other.bin_equity
+        self.bin_actual += other.bin_actual
+
+    def save(self, path):
+        # 임시 파일에 쓴 뒤 교체하므로 저장 도중 중단되어도 이전 체크포인트가 남음
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            np.savez(file, hands=self.hands, showdowns=self.showdowns, position=np.array(self.position),
+                     winning_category_counts=self.winning_category_counts, class_dealt=self.class_dealt,
+                     class_wins=self.class_wins, class_net=self.class_net, bin_counts=self.bin_counts,
+                     bin_equity=self.bin_equity, bin_actual=self.bin_actual)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        stats = cls()
+        with np.load(path) as data:
+            stats.hands = int(data["hands"])
+            stats.showdowns = int(data["showdowns"])
+            stats.position = tuple(int(value) for value in data["position"])
+            for name in ("winning_category_counts", "class_dealt", "class_wins", "class_net",
+                         "bin_counts", "bin_equity", "bin_actual"):
+                setattr(stats, name, data[name].copy())
+        return stats
+
+    def to_dict(self):
+        streets = {}
+        for street, name in enumerate(STREETS):
+            counts = self.bin_counts[street]
+            total = counts.sum()
+            # 좌석마다 에퀴티와 가져간 몫의 합이 모두 1이므로 전체 평균은 항상 같음 - 구간별 차이를 좌석 수로 가중 평균
+            gap = np.abs(self.bin_equity[street] - self.bin_actual[street]).sum()
+            streets[name] = {
+                "seats": int(total),
+                "calibration_error": float(gap / total * 100) if total else 0.0,
+                "calibration": [
+                    {
+                        "equity_range": [bucket * 100 / EQUITY_BINS, (bucket + 1) * 100 / EQUITY_BINS],
+                        "seats": int(counts[bucket]),
+                        "expected": float(self.bin_equity[street, bucket] / counts[bucket] * 100) if counts[bucket] else 0.0,
+                        "actual": float(self.bin_actual[street, bucket] / counts[bucket] * 100) if counts[bucket] else 0.0,
+                    }
+                    for bucket in range(EQUITY_BINS)
+                ],
+            }
+        return {
+            "hands": int(self.hands),
+            "showdowns": int(self.showdowns),
+            "winning_category_frequencies": {name: int(count)
+                                             for name, count in zip(CATEGORY_NAMES, self.winning_category_counts)},
+            "starting_hands": {
+                class_name(index): {
+                    "dealt": int(self.class_dealt[index]),
+                    "win_rate": float(self.class_wins[index] / self.class_dealt[index] * 100) if self.class_dealt[index] else 0.0,
+                    "net_per_hand": float(self.class_net[index] / self.class_dealt[index]) if self.class_dealt[index] else 0.0,
+                }
+                for index in range(NUM_CLASSES)
+            },
+            "equity_vs_result": streets,
+        }
+
+
+def _street_equity(hole, seated, live, board, street_cards, samples, rng):
+    # 공개된 보드가 street_cards장일 때 살아 있는 좌석의 에퀴티를 남은 보드 samples개로 추정 -> (hands x seats)
+    hands, seats = seated.shape
+    missing = 5 - street_cards
+    rows = hands * samples
+    dead = np.zeros(hands, dtype=np.int64)  # 이미 배분된 모든 카드 (폴드한 좌석 포함)와 공개된 보드
+    for seat in range(seats):
+        for card in range(2):
+            dead |= np.where(seated[:, seat], np.int64(1) << hole[:, seat, card], 0)
+    for card in range(street_cards):
+        dead |= np.int64(1) << board[:, card]
+    runouts = sample_runouts(np.repeat(dead, samples), missing, rng)
+    full_board = np.concatenate([np.repeat(board[:, :street_cards], samples, axis=0), runouts], axis=1)
+
+    strengths = np.full((seats, rows), -1, dtype=np.int64)  # 폴드했거나 빈 좌석은 항상 짐
+    for seat in range(seats):
+        active = np.repeat(live[:, seat], samples)
+        cards = np.concatenate([np.repeat(hole[:, seat], samples, axis=0), full_board], axis=1)
+        cards[~active] = FILLER_HAND  # 빈 좌석이나 폴드한 좌석 자리
+        strengths[seat] = np.where(active, evaluate_cards(cards), -1)
+    _, _, shares = share_matrix(strengths)
+    return shares.reshape(seats, hands, samples).mean(axis=2).T
+
+
+def analyze_chunk(records, equity_samples=EQUITY_SAMPLES, rng=None):
+    # 레코드 청크 하나를 벡터 연산으로 집계한 LogStats
+    rng = rng if rng is not None else np.random.default_rng()
+    stats = LogStats()
+    records = records[records["winners"] != 0]  # 승자 없이 중단된 핸드는 통계에서 제외
+    stats.hands = len(records)
+    if not len(records):
+        return stats
+    seats = int(records["players"].max())
+    seat_bits = np.arange(seats)
+    seated = seat_bits[None, :] < records["players"][:, None]
+    hole = records["hole"][:, :seats].astype(np.intp)
+    board = records["board"].astype(np.intp)
+    winners = ((records["winners"][:, None].astype(np.int64) >> seat_bits) & 1).astype(bool) & seated
+    folded = ((records["folded"][:, None].astype(np.int64) >> seat_bits) & 1).astype(bool)
+    winner_count = np.maximum(winners.sum(axis=1), 1)
+    share = winners / winner_count[:, None]  # 좌석별 가져간 팟의 몫
+    net = share * records["pot"][:, None] - records["bets"][:, :seats]
+
+    classes = hand_classes(hole[:, :, 0], hole[:, :, 1])[seated]
+    stats.class_dealt += np.bincount(classes, minlength=NUM_CLASSES)
+    stats.class_wins += np.bincount(classes, weights=share[seated], minlength=NUM_CLASSES)
+    stats.class_net += np.bincount(classes, weights=net[seated], minlength=NUM_CLASSES)
+
+    showdown = (records["category"] != NO_SHOWDOWN) & (records["board"][:, 4] != NO_CARD)
+    stats.showdowns = int(showdown.sum())
+    stats.winning_category_counts += np.bincount(records["category"][showdown],
+                                                 minlength=len(CATEGORY_NAMES))[:len(CATEGORY_NAMES)]
+    if not equity_samples or not stats.showdowns:
+        return stats
+
+    # 쇼다운 핸드만 골라 스트리트별 추정 에퀴티와 실제 결과를 구간별로 누적
+    live = seated & ~folded
+    indices = np.flatnonzero(showdown)
+    block = max(1, _CHUNK // equity_samples)
+    for start in range(0, len(indices), block):
+        chosen = indices[start:start + block]
+        actual = share[chosen][live[chosen]]
+        for street, street_cards in enumerate(_STREET_CARDS):
+            equity = _street_equity(hole[chosen], seated[chosen], live[chosen], board[chosen], street_cards,
+                                    equity_samples, rng)[live[chosen]]
+            buckets = np.minimum((equity * EQUITY_BINS).astype(np.intp), EQUITY_BINS - 1)
+            stats.bin_counts[street] += np.bincount(buckets, minlength=EQUITY_BINS)
+            stats.bin_equity[street] += np.bincount(buckets, weights=equity, minlength=EQUITY_BINS)
+            stats.bin_actual[street] += np.bincount(buckets, weights=actual, minlength=EQUITY_BINS)
+    return stats
+
+
+def iter_spans(path, chunk_records=CHUNK_RECORDS, position=(-1, 0)):
+    # (세그먼트 파일, 세그먼트 번호, 시작, 끝) 청크 범위를 position 이후부터 차례로 생성
+    for segment in log_segments(path):
+        number = int(segment.rsplit(".", 1)[1])
+        if number < position[0]:
+            continue
+        count = len(read_log(segment))
+        first = position[1] if number == position[0] else 0
+        for start in range(first, count, chunk_records):
+            yield segment, number, start, min(start + chunk_records, count)
+
+
+def _analyze_span(segment, number, start, stop, equity_samples, seed):
+    # 워커 프로세스에서도 쓰는 청크 처리: 세그먼트를 직접 mmap하므로 레코드를 주고받지 않음
+    rng = np.random.default_rng(None if seed is None else [seed, number, start])  # 청크별 재현 가능한 난수
+    return analyze_chunk(read_log(segment)[start:stop], equity_samples, rng)
+
+
+def iter_chunk_stats(path, chunk_records=CHUNK_RECORDS, position=(-1, 0), equity_samples=EQUITY_SAMPLES,
+                     seed=None, workers=0):
+    # 청크별 (범위, LogStats)를 로그 순서대로 생성 (workers > 0이면 프로세스 풀에서 처리, 동시에 2 x workers개까지)
+    spans = iter_spans(path, chunk_records, position)
+    if not workers:
+        for span in spans:
+            yield span, _analyze_span(*span, equity_samples, seed)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for span in spans:
+            pending.append((span, executor.submit(_analyze_span, *span, equity_samples, seed)))
+            if len(pending) >= 2 * workers:
+                span, future = pending.popleft()
+                yield span, future.result()
+        while pending:
+            span, future = pending.popleft()
+            yield span, future.result()
+
+
+def analyze_log(path, chunk_records=CHUNK_RECORDS, equity_samples=EQUITY_SAMPLES, seed=None, workers=0,
+                checkpoint=None, checkpoint_every=16):
+    # 로그 전체를 집계 (checkpoint 파일이 있으면 저장된 위치부터 이어서 처리)
+    stats = LogStats.load(checkpoint) if checkpoint and os.path.exists(checkpoint) else LogStats()
+    processed = 0
+    for (_, number, _, stop), chunk in iter_chunk_stats(path, chunk_records, stats.position, equity_samples,
+                                                        seed, workers):
+        stats.merge(chunk)
+        stats.position = (number, stop)
+        processed += 1
+        if checkpoint and processed % checkpoint_every == 0:
+            stats.save(checkpoint)
+    if checkpoint:
+        stats.save(checkpoint)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="핸드 히스토리 로그 스트리밍 분석")
+    parser.add_argument("path", help="로그 경로 (세그먼트 번호를 뺀 앞부분)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_RECORDS, help="청크 하나의 레코드 수")
+    parser.add_argument("--equity-samples", type=int, default=EQUITY_SAMPLES,
+                        help="핸드당 에퀴티 추정에 쓰는 남은 보드 수 (0이면 에퀴티 분석 생략)")
+    parser.add_argument("--workers", type=int, default=0, help="청크를 처리할 프로세스 수 (0이면 현재 프로세스)")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드")
+    parser.add_argument("--checkpoint", default=None, help="진행 위치와 누적 결과를 저장할 파일")
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = analyze_log(args.path, args.chunk, args.equity_samples, args.seed, args.workers, args.checkpoint)
+    elapsed = time.perf_counter() - start
+    result = stats.to_dict()
+    print(f"{stats.hands} hands ({stats.showdowns} showdowns) in {elapsed:.2f}s")
+    for name, street in result["equity_vs_result"].items():
+        print(f"  {name:<8} calibration error {street['calibration_error']:6.2f}pp ({street['seats']} seats)")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# game.py / card.py 핫 패스 벤치마크
+#
+# 모든 작업량은 고정 시드로 만들어 재현 가능하며, 함수별 / 스트리트별(preflop, flop, turn, river) /
+# 테이블 인원별(2 ~ 9명)로 측정한다. 결과를 JSON 기준선으로 저장하고, 이후 실행에서 기준선과 비교해
+# 허용 범위 이상 느려진 항목이 있으면 0이 아닌 종료 코드를 반환한다.
+#
+# 사용법: python benchmark.py [--filter 이름] [--save baseline.json] [--compare baseline.json]
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from card import Deck
+from equity_cache import EquityCache
+from game import HoldemGame
+from player import Player
+
+SEED = 20240601  # 모든 작업량에 사용하는 고정 시드
+STREETS = ["preflop", "flop", "turn", "river"]
+TABLE_SIZES = range(2, 10)
+
+
+def make_game(players, street, seed=SEED):
+    random.seed(seed)
+    game = HoldemGame([Player(f"Player {seat + 1}") for seat in range(players)],
+                      equity_cache=EquityCache(0))  # 캐시를 끄고 매번 실제로 계산
+    game.start_game()
+    for reveal in [game.reveal_flop, game.reveal_turn, game.reveal_river][:STREETS.index(street)]:
+        reveal()
+    return game
+
+
+def random_hands(size, count, seed=SEED):
+    rng = random.Random(seed)
+    return [rng.sample(range(52), size) for _ in range(count)]
+
+
+def cycle(func, inputs):
+    position = [0]
+
+    def call():
+        func(inputs[position[0] % len(inputs)])
+        position[0] += 1
+    return call
+
+
+def build_cases(quick=False):
+    # (이름, 호출 함수, 반복 횟수, 반복당 호출 수) - 호출마다 시간을 따로 잼
+    cases = []
+    game = make_game(2, "preflop")
+    five, seven = random_hands(5, 1000), random_hands(7, 1000)
+    cases.append(("Deck.__init__", Deck, 50, 200))
+    for players in (2, 9):
+        cases.append((f"reset_game[{players}p]", make_game(players, "preflop").reset_game, 50, 200))
+    cases.append(("hand_rank", cycle(game.hand_rank, five), 50, 1000))
+    cases.append(("get_best_hand", cycle(game.get_best_hand, seven), 30, 100))
+    cases.append(("hand_description", cycle(game.hand_description, seven), 50, 1000))
+    for street in STREETS:
+        for players in TABLE_SIZES:
+            target = make_game(players, street)
+            cases.append((f"calculate_win_probability[{street},{players}p]",
+                          target.calculate_win_probability, 5 if quick else 20, 1))
+    for players in TABLE_SIZES:
+        target = make_game(players, "preflop")
+        cases.append((f"calculate_win_probability[preflop-table,{players}p]",
+                      lambda target=target: target.calculate_win_probability(mode="preflop"), 20, 1000))
+    return cases
+
+
+def run_case(func, repeat, number):
+    func()  # 워밍업
+    clock = time.perf_counter
+    samples = np.empty(repeat * number)
+    for i in range(repeat * number):
+        start = clock()
+        func()
+        samples[i] = clock() - start  # 호출마다 따로 잰 시간 (초) - 백분위수가 평균에 묻히지 않도록
+    return {
+        "ops_per_sec": float(1 / samples.mean()),
+        "mean_us": float(samples.mean() * 1e6),
+        "p50_us": float(np.percentile(samples, 50) * 1e6),
+        "p90_us": float(np.percentile(samples, 90) * 1e6),
+        "p99_us": float(np.percentile(samples, 99) * 1e6),
+        "calls": repeat * number,
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        ratio = result["ops_per_sec"] / reference["ops_per_sec"]
+        flag = "REGRESSION" if ratio < 1 - tolerance else ""
+        print(f"{name:<48}{ratio:8.2f}x  {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="game.py / card.py 핫 패스 벤치마크")
+    parser.add_argument("--filter", default=None, help="이름에 이 문자열이 포함된 항목만 실행")
+    parser.add_argument("--quick", action="store_true", help="승률 계산 반복 횟수를 줄여 빠르게 실행")
+    parser.add_argument("--save", default=None, help="결과를 저장할 JSON 기준선 파일")
+    parser.add_argument("--compare", default=None, help="비교할 JSON 기준선 파일")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="허용하는 처리량 감소 비율")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<48}{'ops/sec':>12}{'p50 us':>12}{'p90 us':>12}{'p99 us':>12}")
+    for name, func, repeat, number in build_cases(args.quick):
+        if args.filter and args.filter not in name:
+            continue
+        result = run_case(func, repeat, number)
+        results[name] = result
+        print(f"{name:<48}{result['ops_per_sec']:12,.1f}{result['p50_us']:12,.1f}"
+              f"{result['p90_us']:12,.1f}{result['p99_us']:12,.1f}")
+
+    if args.save:
+        meta = {"python": platform.python_version(), "numpy": np.__version__,
+                "machine": platform.machine(), "seed": SEED, "timestamp": time.time()}
+        with open(args.save, "w") as file:
+            json.dump({"meta": meta, "results": results}, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)}개 항목이 기준선보다 느려졌습니다.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# 시간 제한 몬테카를로 트리 탐색 베팅 봇
+#
+# 결정마다 주어진 시간(예: 50ms) 동안 보이지 않는 카드(상대 홀 카드와 남은 보드)를 무작위로 정해 놓고
+# 베팅 트리를 UCT로 내려간 뒤, 트리 밖에서는 모두 체크/콜로 쇼다운까지 진행해 좌석별 손익을 역전파한다.
+# 트리 노드는 행동 순서로만 구분하므로 같은 핸드의 다음 결정에서는 실제로 일어난 행동을 따라 내려간
+# 하위 트리를 그대로 재사용한다. 쇼다운은 보드 프로필을 한 번만 계산하는 평가기로 처리한다.
+#
+# 사용법: python bot.py --hands 200 --players 4 --budget-ms 50
+import argparse
+import math
+import random
+import time
+
+from game import ACT_CALL, ACT_FOLD, ACT_RAISE, BET_UNIT, MAX_RAISES, HoldemGame, raise_size, seats_after
+from player import Player
+from showdown import BoardProfile
+
+BUDGET_MS = 50  # 결정 하나에 쓰는 기본 시간
+EXPLORATION = 1.0  # UCT 탐색 상수
+
+
+class _Betting:
+    # 탐색용 베팅 상태 (HoldemGame.betting_round와 같은 리밋 베팅 규칙)
+    __slots__ = ("street", "contrib", "active", "to_act", "raises", "current", "done")
+
+    def __init__(self, street, contrib, active, to_act, raises, current):
+        self.street = street  # 0 프리플랍 ~ 3 리버
+        self.contrib = contrib  # 좌석별 이번 핸드 베팅 합계
+        self.active = active  # 폴드하지 않은 좌석 (좌석 순서)
+        self.to_act = to_act  # 이번 스트리트에서 아직 행동할 좌석
+        self.raises = raises  # 이번 스트리트의 레이즈 횟수
+        self.current = current  # 맞춰야 하는 베팅 합계
+        self.done = False  # 핸드가 끝났는지 (한 명만 남았거나 리버 베팅이 끝남)
+
+    @classmethod
+    def from_game(cls, game):
+        return cls(game.street, [player.current_bet for player in game.players],
+                   [seat for seat, player in enumerate(game.players) if not player.folded],
+                   list(game.to_act), game.street_raises, game.current_bet)
+
+    def copy(self):
+        state = _Betting(self.street, list(self.contrib), list(self.active), list(self.to_act), self.raises,
+                         self.current)
+        state.done = self.done
+        return state
+
+    @property
+    def actor(self):
+        return self.to_act[0]
+
+    def legal(self):
+        actions = [ACT_FOLD] if self.current > self.contrib[self.actor] else []  # 콜할 금액이 없으면 폴드하지 않음
+        actions.append(ACT_CALL)
+        if self.raises < MAX_RAISES:
+            actions.append(ACT_RAISE)
+        return actions
+
+    def apply(self, action):
+        seat = self.to_act.pop(0)
+        if action == ACT_FOLD:
+            self.active.remove(seat)
+        elif action == ACT_RAISE:
+            self.current += raise_size(self.street)
+            self.contrib[seat] = self.current
+            self.raises += 1
+            self.to_act = seats_after(self.active, seat)
+        else:
+            self.contrib[seat] = self.current
+        if len(self.active) == 1:
+            self.done = True
+        elif not self.to_act:
+            if self.street == 3:
+                self.done = True
+            else:
+                self.street += 1  # 다음 스트리트는 남은 좌석이 0번부터 다시 행동
+                self.raises = 0
+                self.to_act = list(self.active)
+
+    def payoffs(self, holes, board):
+        # 좌석별 손익을 이번 핸드 전체 팟 크기로 나눈 값 (-1 ~ 1)
+        pot = sum(self.contrib)
+        if len(self.active) == 1:
+            winners = self.active
+        else:
+            profile = BoardProfile(board)
+            strengths = {seat: profile.evaluate(holes[seat]) for seat in self.active}
+            best = max(strengths.values())
+            winners = [seat for seat in self.active if strengths[seat] == best]
+        scale = max(pot, 1)
+        result = [-contribution / scale for contribution in self.contrib]
+        for seat in winners:
+            result[seat] += pot / len(winners) / scale
+        return result
+
+
+class Node:
+    __slots__ = ("children", "visits", "totals")
+
+    def __init__(self, seats):
+        self.children = {}  # 행동 -> Node
+        self.visits = 0
+        self.totals = [0.0] * seats  # 좌석별 누적 보상
+
+    def select(self, actions, actor, exploration):
+        # 아직 시도하지 않은 행동이 있으면 먼저, 아니면 행동하는 좌석의 보상 기준 UCT
+        for action in actions:
+            if action not in self.children:
+                return action
+        log_visits = math.log(self.visits)
+        return max(actions, key=lambda action: self.children[action].totals[actor] / self.children[action].visits
+                   + exploration * math.sqrt(log_visits / self.children[action].visits))
+
+
+class MCTSBot:
+    def __init__(self, budget_ms=BUDGET_MS, exploration=EXPLORATION, seed=None):
+        self.budget = budget_ms / 1000
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None  # 현재 핸드의 탐색 트리에서 지금 결정 지점에 해당하는 노드
+        self.hand = None  # 트리가 속한 (게임, 핸드 번호, 좌석)
+        self.seen = 0  # 트리에 반영한 game.actions 개수
+        self.last_rollouts = 0  # 마지막 결정에서 완료한 롤아웃 수
+        self.total_rollouts = 0
+        self.decisions = 0
+        self.reused_visits = 0  # 재사용한 하위 트리에 이미 쌓여 있던 방문 수 합계
+
+    def _advance(self, game, seat):
+        # 같은 핸드라면 지난 결정 이후의 실제 행동을 따라 하위 트리로 내려가고, 아니면 새 트리를 만듦
+        hand = (id(game), game.hand_number, seat)
+        if hand != self.hand or self.root is None or len(game.actions) < self.seen:
+            self.hand = hand
+            self.root = Node(len(game.players))
+            self.seen = len(game.actions)
+            return
+        for _, _, action in game.actions[self.seen:]:
+            child = self.root.children.get(action)
+            self.root = child if child is not None else Node(len(game.players))
+        self.seen = len(game.actions)
+
+    def decide(self, game, seat):
+        if not game.to_act or game.to_act[0] != seat:
+            raise Exception("베팅 라운드에서 자기 차례에만 결정할 수 있습니다.")
+        deadline = time.perf_counter() + self.budget
+        self._advance(game, seat)
+        self.reused_visits += self.root.visits
+        start = _Betting.from_game(game)
+        hole = list(game.players[seat].hand)
+        board = list(game.table_cards)
+        known = set(hole) | set(board)
+        unknown = [card for card in range(52) if card not in known]
+        opponents = [other for other in range(len(game.players)) if other != seat]
+        missing = 5 - len(board)
+        rollouts = 0
+        while True:
+            # 보이지 않는 카드를 정하고 (결정화) 트리를 한 번 내려감
+            dealt = self.rng.sample(unknown, 2 * len(opponents) + missing)
+            holes = {seat: hole}
+            for i, other in enumerate(opponents):
+                holes[other] = dealt[2 * i:2 * i + 2]
+            full_board = board + dealt[2 * len(opponents):]
+            self._iterate(start.copy(), holes, full_board)
+            rollouts += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.last_rollouts = rollouts
+        self.total_rollouts += rollouts
+        self.decisions += 1
+        return max(self.root.children, key=lambda action: self.root.children[action].visits)
+
+    def _iterate(self, state, holes, board):
+        node = self.root
+        path = [node]
+        expanded = False
+        while not state.done:
+            if expanded:
+                state.apply(ACT_CALL)  # 트리 밖: 모두 체크/콜
+                continue
+            action = node.select(state.legal(), state.actor, self.exploration)
+            child = node.children.get(action)
+            if child is None:
+                child = node.children[action] = Node(len(node.totals))
+                expanded = True  # 롤아웃마다 노드 하나만 추가
+            state.apply(action)
+            node = child
+            path.append(node)
+        rewards = state.payoffs(holes, board)
+        for visited in path:
+            visited.visits += 1
+            for seat, reward in enumerate(rewards):
+                visited.totals[seat] += reward
+
+    def stats(self):
+        return {
+            "decisions": self.decisions,
+            "total_rollouts": self.total_rollouts,
+            "rollouts_per_decision": self.total_rollouts / self.decisions if self.decisions else 0.0,
+            "last_rollouts": self.last_rollouts,
+            "reused_visits": self.reused_visits,
+        }
+
+
+def play_hand(game, bots):
+    # 모든 좌석을 봇이 맡아 한 핸드를 진행하고 좌석별 손익을 반환
+    game.reset_game()
+    game.start_game()
+    game.bet(0, BET_UNIT // 2)  # 블라인드
+    game.bet(1, BET_UNIT)
+    decide = lambda table, seat: bots[seat].decide(table, seat)
+    for reveal in (None, game.reveal_flop, game.reveal_turn, game.reveal_river):
+        if sum(not player.folded for player in game.players) == 1:
+            break
+        if reveal is not None:
+            reveal()
+        game.betting_round(decide)
+    result = game.showdown() if len(game.table_cards) == 5 else None
+    contributions = [player.current_bet for player in game.players]
+    if result is not None:
+        payouts = result.payouts
+    else:
+        payouts = [game.pot if not player.folded else 0 for player in game.players]
+    return [payout - contribution for payout, contribution in zip(payouts, contributions)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCTS 봇끼리 핸드를 진행")
+    parser.add_argument("--hands", type=int, default=100, help="진행할 핸드 수")
+    parser.add_argument("--players", type=int, default=2, help="테이블 인원 (2 ~ 10)")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="결정 하나에 쓰는 시간 (ms)")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드")
+    args = parser.parse_args()
+    if not 2 <= args.players <= 10:
+        parser.error("테이블 인원은 2 ~ 10명이어야 합니다.")
+
+    game = HoldemGame([Player(f"Bot {seat + 1}") for seat in range(args.players)])
+    bots = [MCTSBot(args.budget_ms, seed=None if args.seed is None else args.seed + seat) for seat in range(args.players)]
+    net = [0] * args.players
+    start = time.perf_counter()
+    for _ in range(args.hands):
+        for seat, amount in enumerate(play_hand(game, bots)):
+            net[seat] += amount
+    elapsed = time.perf_counter() - start
+    decisions = sum(bot.decisions for bot in bots)
+    rollouts = sum(bot.total_rollouts for bot in bots)
+    print(f"{args.hands} hands, {decisions} decisions in {elapsed:.2f}s "
+          f"({rollouts / max(decisions, 1):,.0f} rollouts/decision)")
+    for seat, bot in enumerate(bots):
+        print(f"  Bot {seat + 1}: net {net[seat]:+d}, rollouts/decision {bot.stats()['rollouts_per_decision']:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
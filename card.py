@@ -1,22 +1,111 @@
 import random
 
+import numpy as np
+
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']  # 슈트 순서 (인코딩의 하위 2비트)
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']  # 랭크 순서 (인코딩의 상위 비트)
+
+# 카드는 0~51 사이의 정수로 표현: rank_index * 4 + suit_index
+CARD_NAMES = [f"{RANKS[code >> 2]} of {SUITS[code & 3]}" for code in range(52)]  # 정수 코드 -> 카드 이름
+
+
+def encode_card(suit, rank):
+    return RANKS.index(rank) * 4 + SUITS.index(suit)  # 슈트와 랭크 문자열을 정수 코드로 변환
+
+
 class Card:
+    __slots__ = ('code',)  # 표시와 이미지 조회용 래퍼이므로 정수 코드만 보관
+
     def __init__(self, suit, rank):
-        self.suit = suit  # 카드의 슈트 (Hearts, Diamonds, Clubs, Spades)
-        self.rank = rank  # 카드의 랭크 (2, 3, ..., 10, jack, queen, king, ace)
+        self.code = encode_card(suit, rank)  # 카드의 정수 코드
+
+    @classmethod
+    def from_code(cls, code):
+        card = cls.__new__(cls)
+        card.code = code
+        return card
+
+    @property
+    def suit(self):
+        return SUITS[self.code & 3]  # 카드의 슈트 (Hearts, Diamonds, Clubs, Spades)
+
+    @property
+    def rank(self):
+        return RANKS[self.code >> 2]  # 카드의 랭크 (2, 3, ..., 10, jack, queen, king, ace)
+
+    @property
+    def image_file(self):
+        return f"{self.rank}_of_{self.suit.lower()}.png"  # 카드 이미지 파일 이름
 
     def __repr__(self):
-        return f"{self.rank} of {self.suit}"  # 카드의 문자열 표현
+        return CARD_NAMES[self.code]  # 카드의 문자열 표현
+
+    def __int__(self):
+        return self.code
+
+    def __eq__(self, other):
+        return isinstance(other, Card) and self.code == other.code
+
+    def __hash__(self):
+        return self.code
 
     def value(self):
-        card_values = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']
-        return card_values.index(self.rank) + 2  # 카드의 랭크 값을 정수로 반환
+        return (self.code >> 2) + 2  # 카드의 랭크 값을 정수로 반환
+
 
 class Deck:
-    def __init__(self):
-        self.cards = [Card(suit, rank) for suit in ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-                      for rank in ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']]
-        random.shuffle(self.cards)  # 덱을 초기화하고 카드를 섞음
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random  # randrange를 제공하는 난수 생성기
+        self.buffer = list(range(52))  # 미리 할당한 카드 배열: buffer[:size]는 남은 카드, buffer[size:]는 나눠준 카드
+        self.size = 52  # 남은 카드 수
+
+    def reset(self):
+        self.size = 52  # 새 객체를 만들거나 전체를 섞지 않고 제자리에서 초기화
 
     def deal(self):
-        return self.cards.pop()  # 덱에서 카드를 한 장 뽑아 반환
+        # 부분 Fisher-Yates: 뽑는 카드 한 장만 섞음
+        index = self.rng.randrange(self.size)
+        self.size -= 1
+        buffer = self.buffer
+        buffer[index], buffer[self.size] = buffer[self.size], buffer[index]
+        return buffer[self.size]  # 덱에서 카드를 한 장 뽑아 반환 (정수 코드)
+
+    def undeal(self):
+        self.size += 1  # 마지막으로 나눠준 카드를 덱으로 되돌림
+        return self.buffer[self.size - 1]
+
+    def redeal(self):
+        self.size -= 1  # undeal로 되돌린 카드를 다시 나눠줌
+        return self.buffer[self.size]
+
+    @property
+    def cards(self):
+        return self.buffer[:self.size]  # 남은 카드 목록 (복사본)
+
+    def __len__(self):
+        return self.size
+
+
+class BatchDeck:
+    # 시뮬레이션마다 독립적인 덱을 (trials x 남은 카드 수) 배열 하나에 담아 재사용
+    def __init__(self, cards, trials, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.size = len(cards)
+        self.trials = trials
+        self.buffer = np.tile(np.asarray(cards, dtype=np.int8), (trials, 1))  # 각 행은 남은 카드의 순열
+        self.flat = self.buffer.reshape(-1)
+        self.row_offsets = np.arange(trials, dtype=np.intp) * self.size
+
+    def draw(self, count, trials=None):
+        # 앞쪽 trials개의 시뮬레이션마다 서로 다른 카드 count장을 (trials x count) 배열로 반환
+        # 각 행은 이미 순열이므로 초기화 없이 부분 Fisher-Yates를 count번만 적용하면 된다
+        trials = self.trials if trials is None else trials
+        offsets = self.row_offsets[:trials]
+        flat = self.flat
+        for i in range(count):
+            chosen = offsets + self.rng.integers(i, self.size, size=trials)
+            current = offsets + i
+            picked = flat[chosen]
+            flat[chosen] = flat[current]
+            flat[current] = picked
+        return self.buffer[:trials, :count].astype(np.intp)
@@ -0,0 +1,58 @@
+# 크기를 줄인 카드 이미지 52장을 하나의 아틀라스 파일로 묶는 빌드 단계
+#
+# 아틀라스는 13열(랭크) x 4행(슈트) 격자이며, images/ 폴더의 파일 이름, 크기, 수정 시각으로 만든
+# 지문을 PNG 텍스트 청크에 저장한다. 지문이 달라지면 아틀라스를 다시 만든다.
+#
+# 사용법: python card_atlas.py
+import hashlib
+import os
+
+from PIL import Image, PngImagePlugin
+
+from card import Card
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(BASE_DIR, "images")
+ATLAS_PATH = os.path.join(BASE_DIR, "card_atlas.png")
+CARD_SIZE = (100, 150)  # 화면에 표시할 카드 크기
+
+
+def images_fingerprint(images_dir=IMAGES_DIR):
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(images_dir)):
+        info = os.stat(os.path.join(images_dir, name))
+        digest.update(f"{name}:{info.st_size}:{info.st_mtime_ns};".encode())  # 파일이 바뀌면 지문도 바뀜
+    return digest.hexdigest()
+
+
+def card_box(code):
+    left = (code >> 2) * CARD_SIZE[0]  # 열: 랭크
+    top = (code & 3) * CARD_SIZE[1]  # 행: 슈트
+    return left, top, left + CARD_SIZE[0], top + CARD_SIZE[1]
+
+
+def build_atlas(images_dir=IMAGES_DIR, atlas_path=ATLAS_PATH):
+    atlas = Image.new("RGBA", (CARD_SIZE[0] * 13, CARD_SIZE[1] * 4))
+    for code in range(52):
+        with Image.open(os.path.join(images_dir, Card.from_code(code).image_file)) as image:
+            atlas.paste(image.convert("RGBA").resize(CARD_SIZE), card_box(code)[:2])  # 크기를 줄여 격자에 배치
+    info = PngImagePlugin.PngInfo()
+    info.add_text("fingerprint", images_fingerprint(images_dir))
+    atlas.save(atlas_path, pnginfo=info)
+    return atlas
+
+
+def load_atlas(images_dir=IMAGES_DIR, atlas_path=ATLAS_PATH):
+    # 유효한 아틀라스가 있으면 한 번만 읽고, 없거나 오래되었으면 새로 만듦
+    if os.path.exists(atlas_path):
+        atlas = Image.open(atlas_path)
+        if atlas.text.get("fingerprint") == images_fingerprint(images_dir):
+            atlas.load()
+            return atlas
+        atlas.close()
+    return build_atlas(images_dir, atlas_path)
+
+
+if __name__ == "__main__":
+    build_atlas()
+    print(f"아틀라스를 생성했습니다: {ATLAS_PATH}")
@@ -0,0 +1,261 @@
+# NumPy 기반 배치 승률 계산 엔진
+#
+# 모든 시뮬레이션의 남은 보드 카드를 (trials x missing) 배열로 한 번에 뽑고,
+# evaluator의 룩업 테이블을 배열 인덱싱으로 적용해 모든 플레이어의 핸드를 한꺼번에 평가한다.
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb
+from statistics import NormalDist
+
+import numpy as np
+
+from card import BatchDeck
+from evaluator import FLUSH_TABLE, RANK_TABLE_KEYS, RANK_TABLE_VALUES
+
+_CHUNK = 65536  # 한 번에 처리할 시뮬레이션 수 (메모리 사용량 제한)
+EXACT_THRESHOLD = 20000  # 남은 보드 경우의 수가 이 값 이하이면 전수 조사
+ADAPTIVE_BATCH = 8192  # 적응형 시뮬레이션에서 정지 조건을 확인하는 간격
+
+RANK_KEY = np.array([5 ** (code >> 2) for code in range(52)], dtype=np.int64)  # 카드 코드 -> 랭크 5진수 자리값
+RANK_BIT = np.array([1 << (code >> 2) for code in range(52)], dtype=np.int64)  # 카드 코드 -> 랭크 비트
+SUIT = np.array([code & 3 for code in range(52)], dtype=np.int8)  # 카드 코드 -> 슈트 인덱스
+FLUSH = np.array(FLUSH_TABLE, dtype=np.int64)  # 랭크 마스크 -> 플러시 강도
+RANK_KEYS = np.frombuffer(RANK_TABLE_KEYS, dtype=np.int64)  # 정렬된 랭크 키 (searchsorted용)
+RANK_VALUES = np.frombuffer(RANK_TABLE_VALUES, dtype=np.int64)  # 랭크 키에 대응하는 강도
+FILLER_HAND = np.arange(7)  # 평가만 하고 결과는 버리는 행에 넣는 중복 없는 카드 7장
+_CARD_BITS = np.arange(52, dtype=np.int64)
+
+
+class EquityResult:
+    def __init__(self, win, tie, equity, trials, error=None):
+        self.win = win  # 플레이어별 단독 승리 확률 (%)
+        self.tie = tie  # 플레이어별 무승부 확률 (%)
+        self.equity = equity  # 플레이어별 에퀴티 (%) - 무승부는 나눠 가진 몫으로 계산
+        self.trials = trials  # 평가한 보드 수
+        self.error = error  # 플레이어별 에퀴티 신뢰구간 반폭 (%), 전수 조사는 0, 알 수 없으면 None
+
+    def __repr__(self):
+        return (f"EquityResult(win={self.win}, tie={self.tie}, equity={self.equity}, "
+                f"trials={self.trials}, error={self.error})")
+
+
+def _card_profile(cards):
+    key = 0
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        key += 5 ** (card >> 2)
+        suit_masks[card & 3] |= 1 << (card >> 2)
+    return key, suit_masks
+
+
+def evaluate_batch(hole_cards, board, runouts):
+    # 각 플레이어의 (hole + board + runout) 핸드 강도를 (players x trials) 배열로 반환
+    runouts = np.asarray(runouts, dtype=np.intp)
+    trials = runouts.shape[0]
+    run_key = RANK_KEY[runouts].sum(axis=1)  # 모든 플레이어가 공유하는 남은 보드의 랭크 키
+    run_bits = RANK_BIT[runouts]
+    run_suits = SUIT[runouts]
+    run_masks = [np.where(run_suits == suit, run_bits, 0).sum(axis=1) for suit in range(4)]
+
+    strengths = np.empty((len(hole_cards), trials), dtype=np.int64)
+    for i, hand in enumerate(hole_cards):
+        key, suit_masks = _card_profile(list(hand) + list(board))  # 고정된 카드의 프로필은 한 번만 계산
+        result = RANK_VALUES[np.searchsorted(RANK_KEYS, key + run_key)]
+        for suit in range(4):
+            flush = FLUSH[run_masks[suit] | suit_masks[suit]]
+            result = np.maximum(result, flush)  # 플러시가 있으면 항상 랭크 강도보다 큼
+        strengths[i] = result
+    return strengths
+
+
+def share_matrix(strengths):
+    # (players x trials) 강도 배열 -> 최고 핸드 여부, 공동 승자 수, 시뮬레이션별 에퀴티 몫
+    best = strengths.max(axis=0)
+    is_best = strengths == best
+    n_best = is_best.sum(axis=0)
+    return is_best, n_best, is_best / n_best
+
+
+def evaluate_cards(cards):
+    # (trials x k) 카드 코드 배열의 각 행을 하나의 핸드로 평가 (k <= 7)
+    cards = np.asarray(cards, dtype=np.intp)
+    result = RANK_VALUES[np.searchsorted(RANK_KEYS, RANK_KEY[cards].sum(axis=1))]
+    bits = RANK_BIT[cards]
+    suits = SUIT[cards]
+    for suit in range(4):
+        result = np.maximum(result, FLUSH[np.where(suits == suit, bits, 0).sum(axis=1)])
+    return result
+
+
+def sample_runouts(dead, missing, rng):
+    # 행마다 dead 카드 마스크(int64 배열)에 없는 카드 missing장을 균등하게 비복원 추출 -> (행 x missing)
+    # 남은 카드에 무작위 키를 주고 키가 가장 작은 missing장을 고름
+    if not missing:
+        return np.empty((len(dead), 0), dtype=np.intp)
+    keys = rng.random((len(dead), 52))
+    keys[((dead[:, None] >> _CARD_BITS) & 1).astype(bool)] = 2.0
+    return np.argpartition(keys, missing - 1, axis=1)[:, :missing]
+
+
+def tally(strengths):
+    # (players x trials) 강도 배열로부터 플레이어별 승리/무승부/에퀴티 합계를 계산
+    is_best, n_best, shares = share_matrix(strengths)
+    wins = (is_best & (n_best == 1)).sum(axis=1)
+    ties = (is_best & (n_best > 1)).sum(axis=1)
+    return wins, ties, shares.sum(axis=1)
+
+
+def _sample_totals(hole_cards, board, remaining, trials, rng):
+    # trials번의 무작위 보드에 대한 승리/무승부/에퀴티 합계
+    missing = 5 - len(board)
+    wins = np.zeros(len(hole_cards))
+    ties = np.zeros(len(hole_cards))
+    shares = np.zeros(len(hole_cards))
+    deck = BatchDeck(remaining, min(_CHUNK, trials), rng)  # 청크마다 재사용하는 배치 덱
+    done = 0
+    while done < trials:
+        size = min(_CHUNK, trials - done)
+        runouts = deck.draw(missing, size)
+        chunk_wins, chunk_ties, chunk_shares = tally(evaluate_batch(hole_cards, board, runouts))
+        wins += chunk_wins
+        ties += chunk_ties
+        shares += chunk_shares
+        done += size
+    return wins, ties, shares
+
+
+def _to_result(wins, ties, shares, trials):
+    return EquityResult((wins / trials * 100).tolist(), (ties / trials * 100).tolist(), (shares / trials * 100).tolist(), trials)
+
+
+def batch_equity(hole_cards, board, remaining, trials=100000, rng=None):
+    # 플레이어별 승률을 배치 몬테카를로로 계산
+    rng = rng if rng is not None else np.random.default_rng()
+    return _to_result(*_sample_totals(hole_cards, board, remaining, trials, rng), trials)
+
+
+def _parallel_worker(hole_cards, board, remaining, trials, seed_sequence):
+    # 워커 프로세스: 독립된 난수 스트림으로 trials번 시뮬레이션
+    return _sample_totals(hole_cards, board, remaining, trials, np.random.default_rng(seed_sequence))
+
+
+def parallel_equity(hole_cards, board, remaining, trials=1000000, workers=None, seed=None, executor=None):
+    # 프로세스 풀에 시뮬레이션을 나눠 실행 (seed와 workers가 같으면 결과가 재현됨)
+    workers = workers or os.cpu_count() or 1
+    hole_cards = [[int(card) for card in hand] for hand in hole_cards]  # 워커에는 정수 카드 목록만 전달
+    board = [int(card) for card in board]
+    remaining = [int(card) for card in remaining]
+    streams = np.random.SeedSequence(seed).spawn(workers)  # 워커별 독립 난수 스트림
+    shares_per_worker = [trials // workers + (1 if i < trials % workers else 0) for i in range(workers)]
+
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(_parallel_worker, hole_cards, board, remaining, count, stream)
+                   for count, stream in zip(shares_per_worker, streams) if count]
+        totals = [future.result() for future in futures]
+    finally:
+        if executor is None:
+            pool.shutdown()
+    wins, ties, shares = (sum(parts) for parts in zip(*totals))
+    return _to_result(wins, ties, shares, trials)
+
+
+def iter_equity(hole_cards, board, remaining, batch_size=ADAPTIVE_BATCH, confidence=0.95, max_trials=10000000, rng=None):
+    # batch_size번 시뮬레이션할 때마다 누적 결과(신뢰구간 반폭 포함)를 내보내는 제너레이터
+    rng = rng if rng is not None else np.random.default_rng()
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    missing = 5 - len(board)
+    wins = np.zeros(len(hole_cards))
+    ties = np.zeros(len(hole_cards))
+    shares = np.zeros(len(hole_cards))
+    squares = np.zeros(len(hole_cards))  # 에퀴티 몫 제곱합 (분산 추정용)
+    deck = BatchDeck(remaining, min(batch_size, max_trials), rng)  # 배치마다 재사용하는 배치 덱
+    trials = 0
+    while trials < max_trials:
+        size = min(batch_size, max_trials - trials)
+        is_best, n_best, share = share_matrix(evaluate_batch(hole_cards, board, deck.draw(missing, size)))
+        wins += (is_best & (n_best == 1)).sum(axis=1)
+        ties += (is_best & (n_best > 1)).sum(axis=1)
+        shares += share.sum(axis=1)
+        squares += (share * share).sum(axis=1)
+        trials += size
+
+        mean = shares / trials
+        variance = np.maximum(squares / trials - mean * mean, 0) * trials / max(trials - 1, 1)  # 표본 분산
+        result = _to_result(wins, ties, shares, trials)
+        result.error = (z * np.sqrt(variance / trials) * 100).tolist()
+        yield result
+
+
+def adaptive_equity(hole_cards, board, remaining, target_error=0.5, confidence=0.95, time_limit_ms=None,
+                    max_trials=10000000, batch_size=ADAPTIVE_BATCH, rng=None):
+    # 모든 플레이어의 신뢰구간 반폭이 target_error(%) 이하가 되거나 시간 제한에 도달하면 정지
+    deadline = None if time_limit_ms is None else time.perf_counter() + time_limit_ms / 1000
+    result = None
+    for result in iter_equity(hole_cards, board, remaining, batch_size, confidence, max_trials, rng):
+        if target_error is not None and max(result.error) <= target_error:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+    return result
+
+
+def random_opponent_equity(hand, opponents, trials=100000, rng=None):
+    # 알 수 없는 상대 opponents명을 상대로 한 프리플랍 승률 (상대 핸드와 보드를 매 시뮬레이션마다 무작위로 배분)
+    rng = rng if rng is not None else np.random.default_rng()
+    remaining = [card for card in range(52) if card not in hand]
+    wins = np.zeros(1)
+    ties = np.zeros(1)
+    shares = np.zeros(1)
+    deck = BatchDeck(remaining, min(_CHUNK, trials), rng)
+    done = 0
+    while done < trials:
+        size = min(_CHUNK, trials - done)
+        dealt = deck.draw(5 + 2 * opponents, size)
+        board = dealt[:, :5]
+        hero = np.concatenate([np.broadcast_to(np.asarray(hand, dtype=np.intp), (size, 2)), board], axis=1)
+        strengths = [evaluate_cards(hero)]
+        for i in range(opponents):
+            strengths.append(evaluate_cards(np.concatenate([dealt[:, 5 + 2 * i:7 + 2 * i], board], axis=1)))
+        chunk_wins, chunk_ties, chunk_shares = tally(np.stack(strengths))
+        wins += chunk_wins[0]
+        ties += chunk_ties[0]
+        shares += chunk_shares[0]
+        done += size
+    return _to_result(wins, ties, shares, trials)
+
+
+def count_runouts(remaining, missing):
+    return comb(len(remaining), missing)  # 가능한 남은 보드의 경우의 수
+
+
+def exact_equity(hole_cards, board, remaining):
+    # 가능한 모든 남은 보드를 전수 조사하여 정확한 승률을 계산
+    missing = 5 - len(board)
+    total = count_runouts(remaining, missing)
+    wins = np.zeros(len(hole_cards))
+    ties = np.zeros(len(hole_cards))
+    shares = np.zeros(len(hole_cards))
+    runout_iter = combinations(remaining, missing)
+    done = 0
+    while done < total:
+        size = min(_CHUNK, total - done)
+        flat = np.fromiter((card for _, runout in zip(range(size), runout_iter) for card in runout),
+                           dtype=np.intp, count=size * missing)
+        chunk_wins, chunk_ties, chunk_shares = tally(evaluate_batch(hole_cards, board, flat.reshape(size, missing)))
+        wins += chunk_wins
+        ties += chunk_ties
+        shares += chunk_shares
+        done += size
+    result = _to_result(wins, ties, shares, total)
+    result.error = [0.0] * len(hole_cards)  # 전수 조사이므로 오차 없음
+    return result
+
+
+def auto_equity(hole_cards, board, remaining, trials=100000, exact_threshold=EXACT_THRESHOLD, rng=None):
+    # 경우의 수가 적으면 전수 조사, 많으면 배치 몬테카를로
+    if count_runouts(remaining, 5 - len(board)) <= exact_threshold:
+        return exact_equity(hole_cards, board, remaining)
+    return batch_equity(hole_cards, board, remaining, trials, rng)
@@ -0,0 +1,58 @@
+# 슈트 대칭 정규화와 LRU 승률 캐시
+#
+# 슈트 이름만 바꾼 상태(예: 하트 <-> 스페이드)는 승률이 같으므로, 슈트마다 (보드, 각 플레이어)에
+# 속한 랭크 목록을 서명으로 만들고 서명 순서대로 슈트를 다시 붙여 정규화된 키를 만든다.
+# 좌석 순서는 유지되므로 캐시된 결과를 그대로 돌려줄 수 있다.
+from collections import OrderedDict
+
+EQUITY_CACHE_SIZE = 4096  # 기본 캐시 항목 수
+
+def canonical_key(hole_cards, board):
+    # (플레이어별 홀 카드, 보드)를 슈트 치환에 무관한 키로 변환
+    groups = [board] + list(hole_cards)
+    signatures = [tuple(tuple(sorted(card >> 2 for card in group if card & 3 == suit)) for group in groups)
+                  for suit in range(4)]  # 슈트별로 각 그룹에 속한 랭크 목록
+    relabel = [0] * 4
+    for new_suit, old_suit in enumerate(sorted(range(4), key=signatures.__getitem__, reverse=True)):
+        relabel[old_suit] = new_suit  # 서명이 같은 슈트끼리는 어느 쪽으로 바꿔도 같은 결과
+    mapped_board = tuple(sorted((card & ~3) | relabel[card & 3] for card in board))
+    mapped_holes = tuple(tuple(sorted((card & ~3) | relabel[card & 3] for card in hand)) for hand in hole_cards)
+    return mapped_board, mapped_holes
+
+
+class EquityCache:
+    def __init__(self, maxsize=EQUITY_CACHE_SIZE):
+        self.maxsize = maxsize  # 최대 항목 수
+        self.entries = OrderedDict()  # 키 -> 승률 결과 (가장 최근에 사용한 항목이 뒤쪽)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)  # 최근 사용으로 갱신
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)  # 가장 오래 사용하지 않은 항목 제거
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,273 @@
+# 로컬 승률 계산 데몬
+#
+# 평가기와 룩업 테이블을 한 번만 올려 둔 상주 프로세스가 유닉스 도메인 소켓으로 승률 요청을 받는다.
+# 요청은 슈트 정규화 키로 묶어 공유 LRU 캐시에서 먼저 찾고, 같은 키의 계산이 진행 중이면 그 결과를 함께 기다리며,
+# 새로 계산할 요청만 프로세스 풀에 나눠 보낸다. 프로토콜은 줄 단위 JSON이다.
+#
+# 사용법: python equity_service.py serve [--socket PATH] [--workers N]
+#        python equity_service.py bench [--socket PATH] [--clients 32] [--requests 50]
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from equity import EquityResult, auto_equity
+from equity_cache import EquityCache, canonical_key
+from unix_server import LineJsonServer
+
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), "holdem_equity.sock")  # 기본 소켓 경로
+SERVICE_CACHE_SIZE = 65536  # 데몬의 공유 캐시 항목 수
+DEFAULT_TRIALS = 100000  # 요청에 trials가 없을 때의 시뮬레이션 수
+
+
+def _compute_equity(hole_cards, board, trials):
+    # 워커 프로세스: 정규화된 상태의 승률을 계산해 JSON으로 보낼 수 있는 dict로 반환
+    used = set(board).union(*hole_cards)
+    remaining = [card for card in range(52) if card not in used]
+    result = auto_equity(hole_cards, board, remaining, trials)
+    return {"win": result.win, "tie": result.tie, "equity": result.equity, "trials": result.trials,
+            "error": result.error}
+
+
+def _warm_up():
+    # 워커 초기화 함수: 프로세스가 뜰 때 평가기 테이블을 올리고 작은 전수 조사로 NumPy 경로까지 한 번 거침
+    auto_equity([[0, 1], [2, 3]], [4, 5, 6, 7], list(range(8, 52)))
+
+
+def _validate(hole_cards, board):
+    hole_cards = [[int(card) for card in hand] for hand in hole_cards]
+    board = [int(card) for card in board]
+    cards = board + [card for hand in hole_cards for card in hand]
+    if len(hole_cards) < 2 or any(len(hand) != 2 for hand in hole_cards):
+        raise ValueError("두 명 이상의 플레이어가 각각 홀 카드 두 장을 가져야 합니다.")
+    if len(board) > 5 or len(set(cards)) != len(cards) or not all(0 <= card < 52 for card in cards):
+        raise ValueError("카드가 올바르지 않습니다.")
+    return hole_cards, board
+
+
+class EquityService:
+    def __init__(self, workers=None, cache_size=SERVICE_CACHE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        # 소켓 fd를 물려받지 않도록 워커는 spawn으로 띄움
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_warm_up)  # 워커는 첫 작업을 받기 전에 초기화됨
+        self.cache = EquityCache(cache_size)  # 모든 클라이언트가 공유하는 결과 캐시
+        self.inflight = {}  # 키 -> 계산 중인 태스크
+        self.requests = 0
+        self.coalesced = 0  # 진행 중인 같은 계산에 합쳐진 요청 수
+        self.computed = 0  # 워커 풀에서 새로 계산한 요청 수
+
+    async def start(self):
+        # 워커 수만큼 작업을 한꺼번에 보내 프로세스를 미리 띄움 (풀이 모든 워커를 바로 띄운다는 보장은 없지만,
+        # 늦게 뜬 워커도 initializer로 초기화를 마친 뒤에 요청을 받음)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid) for _ in range(self.workers)))
+        return self
+
+    async def equity(self, hole_cards, board, trials=DEFAULT_TRIALS):
+        self.requests += 1
+        hole_cards, board = _validate(hole_cards, board)
+        mapped_board, mapped_holes = canonical_key(hole_cards, board)
+        key = (mapped_board, mapped_holes, trials)  # 슈트만 다른 상태는 같은 키 (좌석 순서는 유지)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, [list(hand) for hand in mapped_holes],
+                                                       list(mapped_board), trials))
+            self.inflight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)  # 한 요청이 취소되어도 함께 기다리는 요청의 계산은 계속
+
+    async def _compute(self, key, hole_cards, board, trials):
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, _compute_equity,
+                                                                      hole_cards, board, trials)
+            self.cache.put(key, result)
+            self.computed += 1
+            return result
+        finally:
+            del self.inflight[key]
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "computed": self.computed,
+            "inflight": len(self.inflight),
+            "workers": self.workers,
+            "cache": self.cache.stats(),
+        }
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class EquityServer(LineJsonServer):
+    # 줄 단위 JSON: {"id", "op": "equity", "hole_cards", "board", "trials"} 또는 {"id", "op": "stats"}
+    #            -> {"id", "result"} 또는 {"id", "error"}
+    def __init__(self, service):
+        super().__init__(self._dispatch)
+        self.service = service
+
+    async def start(self, path=SOCKET_PATH):
+        return await super().start(path)
+
+    async def _dispatch(self, message):
+        if message.get("op", "equity") == "stats":
+            return self.service.stats()
+        return await self.service.equity(message["hole_cards"], message.get("board", []),
+                                         int(message.get("trials", DEFAULT_TRIALS)))
+
+
+class EquityClient:
+    # HoldemGame에서 쓰는 동기 클라이언트 (스레드 간에 공유 가능)
+    def __init__(self, path=SOCKET_PATH, timeout=None):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(path)
+        self.file = self.socket.makefile("rwb")
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+    def _call(self, message):
+        with self.lock:
+            self.next_id += 1
+            message["id"] = self.next_id
+            self.file.write((json.dumps(message) + "\n").encode())
+            self.file.flush()
+            line = self.file.readline()
+        if not line:
+            raise ConnectionError("승률 계산 데몬과의 연결이 끊어졌습니다.")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise Exception(reply["error"])
+        return reply["result"]
+
+    def equity(self, hole_cards, board, trials=DEFAULT_TRIALS):
+        result = self._call({"op": "equity", "hole_cards": [list(hand) for hand in hole_cards],
+                             "board": list(board), "trials": trials})
+        return EquityResult(result["win"], result["tie"], result["equity"], result["trials"], result["error"])
+
+    def stats(self):
+        return self._call({"op": "stats"})
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+
+async def serve(path=SOCKET_PATH, workers=None, cache_size=SERVICE_CACHE_SIZE):
+    service = await EquityService(workers, cache_size).start()
+    server = await EquityServer(service).start(path)
+    print(f"승률 계산 데몬 시작: {path} (워커 {service.workers}개)")
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)  # kill에도 소켓 정리
+    try:
+        await server.server.serve_forever()
+    finally:
+        server.server.close()
+        service.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def daemon_running(path=SOCKET_PATH):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def random_states(count, players, seed):
+    # 벤치마크용 무작위 상태 (플롭/턴/리버 섞음)
+    rng = random.Random(seed)
+    states = []
+    for _ in range(count):
+        cards = rng.sample(range(52), 2 * players + 5)
+        board = cards[2 * players:2 * players + rng.choice((3, 4, 5))]
+        states.append(([cards[2 * seat:2 * seat + 2] for seat in range(players)], board))
+    return states
+
+
+async def _bench_client(path, states, requests, trials, rng, latencies):
+    reader, writer = await asyncio.open_unix_connection(path, limit=2 ** 20)
+    for request in range(requests):
+        hole_cards, board = states[rng.randrange(len(states))]
+        start = time.perf_counter()
+        writer.write((json.dumps({"id": request, "hole_cards": hole_cards, "board": board, "trials": trials}) + "\n").encode())
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if "error" in reply:
+            raise Exception(reply["error"])
+    writer.close()
+    await writer.wait_closed()
+
+
+async def benchmark(path=SOCKET_PATH, clients=32, requests=50, states=200, players=2, trials=20000, workers=None,
+                    seed=0):
+    # 데몬이 떠 있지 않으면 같은 프로세스에 띄워서 측정
+    service = server = None
+    if not daemon_running(path):
+        service = await EquityService(workers).start()
+        server = await EquityServer(service).start(path)
+    pool = random_states(states, players, seed)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_bench_client(path, pool, requests, trials, random.Random(seed + client), latencies)
+                           for client in range(clients)))
+    elapsed = time.perf_counter() - start
+    report = {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "latency_ms": {name: float(np.percentile(latencies, q) * 1000)
+                       for name, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))},
+    }
+    if service is not None:
+        report["service"] = service.stats()
+        await server.close()
+        service.close()
+        os.unlink(path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유닉스 소켓 승률 계산 데몬")
+    parser.add_argument("command", choices=["serve", "bench"], help="serve: 데몬 실행, bench: 처리량/지연 시간 측정")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="유닉스 소켓 경로")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--cache", type=int, default=SERVICE_CACHE_SIZE, help="공유 캐시 항목 수")
+    parser.add_argument("--clients", type=int, default=32, help="bench: 동시 접속 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=50, help="bench: 클라이언트당 요청 수")
+    parser.add_argument("--states", type=int, default=200, help="bench: 요청에 쓰는 서로 다른 상태 수")
+    parser.add_argument("--players", type=int, default=2, help="bench: 상태당 플레이어 수")
+    parser.add_argument("--trials", type=int, default=20000, help="bench: 요청당 시뮬레이션 수")
+    parser.add_argument("--seed", type=int, default=0, help="bench: 난수 시드")
+    args = parser.parse_args()
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.socket, args.workers, args.cache))
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        return
+    report = asyncio.run(benchmark(args.socket, args.clients, args.requests, args.states, args.players, args.trials,
+                                   args.workers, args.seed))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
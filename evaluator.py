@@ -0,0 +1,250 @@
+# 7장 이하의 핸드를 한 번의 순회로 평가하는 룩업 테이블 기반 평가기
+#
+# 핸드 강도는 하나의 정수로 표현된다: category << 20 | 키커 랭크 5개(각 4비트)
+# 값이 클수록 강한 핸드이며, 정수 비교만으로 승패를 가릴 수 있다.
+# 족보 설명과 최상의 5장은 강도에 담긴 족보/랭크만으로 다시 평가하지 않고 얻는다.
+# 랭크 테이블은 처음 한 번만 만들어 rank_table.bin에 저장하고, 이후 프로세스는 파일을 읽기만 한다.
+import os
+import struct
+from array import array
+
+HIGH_CARD, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH = range(9)
+CATEGORY_NAMES = ['High card', 'One pair', 'Two pair', 'Three of a kind', 'Straight',
+                  'Flush', 'Full house', 'Four of a kind', 'Straight flush']
+
+_RANK_BIT = [1 << (code >> 2) for code in range(52)]  # 카드 코드 -> 랭크 비트
+_RANK_KEY = [5 ** (code >> 2) for code in range(52)]  # 카드 코드 -> 랭크 개수의 5진수 자리값
+
+RANK_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rank_table.bin")
+_MAGIC = b"RKTB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHI")  # magic, version, 항목 수 (뒤에 int64 키 배열, int64 강도 배열)
+
+
+def _make_strength(category, ranks):
+    strength = category
+    for i in range(5):
+        strength = (strength << 4) | (ranks[i] if i < len(ranks) else 0)  # 키커를 4비트씩 채움
+    return strength
+
+
+def _top_ranks(mask, count):
+    ranks = []
+    for rank in range(12, -1, -1):
+        if mask & (1 << rank):
+            ranks.append(rank + 2)  # 랭크 값 (2 ~ 14)
+            if len(ranks) == count:
+                break
+    return ranks
+
+
+def _straight_high(mask):
+    for high in range(12, 3, -1):
+        window = 0b11111 << (high - 4)
+        if mask & window == window:
+            return high + 2  # 스트레이트의 가장 높은 랭크 값
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 5  # A-2-3-4-5 (휠) 스트레이트
+    return 0
+
+
+STRAIGHT_HIGH = [_straight_high(mask) for mask in range(1 << 13)]  # 랭크 마스크 -> 스트레이트 최고 랭크
+POPCOUNT = [bin(mask).count('1') for mask in range(1 << 13)]  # 랭크 마스크 -> 비트 수
+
+
+def _flush_strength(mask):
+    if POPCOUNT[mask] < 5:
+        return 0
+    high = STRAIGHT_HIGH[mask]
+    if high:
+        return _make_strength(STRAIGHT_FLUSH, [high])
+    return _make_strength(FLUSH, _top_ranks(mask, 5))
+
+
+FLUSH_TABLE = [_flush_strength(mask) for mask in range(1 << 13)]  # 한 슈트의 랭크 마스크 -> 플러시 강도 (없으면 0)
+
+
+def _rank_strength(counts):
+    # 플러시가 없는 경우 랭크 개수만으로 강도를 계산
+    mask = 0
+    groups = [[], [], [], [], []]  # 개수별 랭크 값 (높은 랭크부터)
+    for rank in range(12, -1, -1):
+        if counts[rank]:
+            mask |= 1 << rank
+            groups[counts[rank]].append(rank + 2)
+    quads, trips, pairs, singles = groups[4], groups[3], groups[2], groups[1]
+    if quads:
+        return _make_strength(FOUR_OF_A_KIND, [quads[0]] + _top_ranks(mask & ~(1 << (quads[0] - 2)), 1))
+    if trips and (len(trips) > 1 or pairs):
+        pair = max(trips[1:] + pairs[:1])
+        return _make_strength(FULL_HOUSE, [trips[0], pair])
+    if STRAIGHT_HIGH[mask]:
+        return _make_strength(STRAIGHT, [STRAIGHT_HIGH[mask]])
+    if trips:
+        return _make_strength(THREE_OF_A_KIND, trips[:1] + singles[:2])
+    if len(pairs) >= 2:
+        return _make_strength(TWO_PAIR, pairs[:2] + sorted(pairs[2:3] + singles[:1], reverse=True)[:1])
+    if pairs:
+        return _make_strength(ONE_PAIR, pairs[:1] + singles[:3])
+    return _make_strength(HIGH_CARD, singles[:5])
+
+
+def _build_rank_table():
+    table = {}
+    counts = [0] * 13
+
+    def fill(rank, total, key):
+        if rank == 13:
+            if total:
+                table[key] = _rank_strength(counts)
+            return
+        for count in range(min(4, 7 - total) + 1):
+            counts[rank] = count
+            fill(rank + 1, total + count, key + count * 5 ** rank)
+        counts[rank] = 0
+
+    fill(0, 0, 0)
+    return table
+
+
+def _read_rank_table(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION or len(data) != _HEADER.size + 16 * count:
+        raise ValueError(f"랭크 테이블 형식이 올바르지 않습니다: {path}")
+    keys, values = array("q"), array("q")
+    keys.frombytes(data[_HEADER.size:_HEADER.size + 8 * count])
+    values.frombytes(data[_HEADER.size + 8 * count:])
+    return keys, values
+
+
+def load_rank_table(path=RANK_TABLE_PATH):
+    # 키 순으로 정렬된 (키 배열, 강도 배열) - 파일이 없거나 형식이 다르면 새로 만들어 저장 (저장할 수 없으면 메모리에만)
+    try:
+        return _read_rank_table(path)
+    except (OSError, ValueError, struct.error):
+        pass
+    table = _build_rank_table()
+    keys = array("q", sorted(table))
+    values = array("q", (table[key] for key in keys))
+    try:
+        temporary = f"{path}.{os.getpid()}.tmp"  # 여러 프로세스가 동시에 만들어도 완성된 파일만 보이도록
+        with open(temporary, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, len(keys)))
+            file.write(keys.tobytes())
+            file.write(values.tobytes())
+        os.replace(temporary, path)
+    except OSError:
+        pass
+    return keys, values
+
+
+RANK_TABLE_KEYS, RANK_TABLE_VALUES = load_rank_table()  # 정렬된 랭크 키와 강도 (NumPy 평가기의 searchsorted용)
+RANK_TABLE = dict(zip(RANK_TABLE_KEYS, RANK_TABLE_VALUES))  # 랭크 개수의 5진수 키 -> 플러시가 아닌 경우의 강도
+
+
+def evaluate(cards):
+    # 1~7장의 카드 코드를 받아 핸드 강도를 반환 (한 번의 순회)
+    key = 0
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        key += _RANK_KEY[card]
+        suit_masks[card & 3] |= _RANK_BIT[card]
+    for mask in suit_masks:
+        if FLUSH_TABLE[mask]:
+            return FLUSH_TABLE[mask]  # 7장 이하에서는 플러시가 있으면 풀하우스/포카드가 불가능
+    return RANK_TABLE[key]
+
+
+def hand_category(strength):
+    return strength >> 20  # 핸드 족보 (0: 하이카드 ~ 8: 스트레이트 플러시)
+
+
+def strength_ranks(strength):
+    return [(strength >> shift) & 0xF for shift in (16, 12, 8, 4, 0)]  # 강도에 담긴 키커 랭크 값
+
+
+# 족보별로 강도의 키커 자리 하나가 나타내는 카드 장수 (스트레이트 계열은 최고 랭크만 담기므로 따로 처리)
+_SLOT_COUNTS = {
+    HIGH_CARD: (1, 1, 1, 1, 1),
+    ONE_PAIR: (2, 1, 1, 1),
+    TWO_PAIR: (2, 2, 1),
+    THREE_OF_A_KIND: (3, 1, 1),
+    FLUSH: (1, 1, 1, 1, 1),
+    FULL_HOUSE: (3, 2),
+    FOUR_OF_A_KIND: (4, 1),
+}
+
+
+def best_five_indices(cards, strength=None):
+    # 강도에 담긴 랭크만으로 최상의 5장을 골라 cards 안의 인덱스로 반환 (조합을 다시 평가하지 않음)
+    if strength is None:
+        strength = evaluate(cards)
+    category = hand_category(strength)
+    ranks = strength_ranks(strength)
+    if category in (STRAIGHT, STRAIGHT_FLUSH):
+        high = ranks[0]
+        needed = [(rank if rank > 1 else 14, 1) for rank in range(high, high - 5, -1)]  # 휠은 A를 1로 취급
+    else:
+        needed = [(rank, count) for rank, count in zip(ranks, _SLOT_COUNTS[category]) if rank]
+    suit = None
+    if category in (FLUSH, STRAIGHT_FLUSH):
+        suit_counts = [0, 0, 0, 0]
+        for card in cards:
+            suit_counts[card & 3] += 1
+        suit = suit_counts.index(max(suit_counts))  # 7장 이하에서 5장 이상인 슈트는 하나뿐
+    indices = []
+    for rank, count in needed:
+        for i, card in enumerate(cards):
+            if count and (card >> 2) + 2 == rank and (suit is None or card & 3 == suit) and i not in indices:
+                indices.append(i)
+                count -= 1
+    return tuple(indices)
+
+
+def best_five(cards):
+    if len(cards) <= 5:
+        return tuple(cards)
+    return tuple(cards[i] for i in best_five_indices(cards))  # 강도가 가장 높은 5장 조합
+
+
+_RANK_TO_STR = {14: 'A', 13: 'K', 12: 'Q', 11: 'J'}
+
+
+def _rank_str(value):
+    return _RANK_TO_STR.get(value, str(value))
+
+
+def _describe(strength):
+    category = hand_category(strength)
+    ranks = strength_ranks(strength)
+    first, second = _rank_str(ranks[0]), _rank_str(ranks[1])
+    if category == STRAIGHT_FLUSH:
+        return f"Straight flush, {first} high"
+    elif category == FOUR_OF_A_KIND:
+        return f"Four of a kind, {first}s"
+    elif category == FULL_HOUSE:
+        return f"Full house, {first}s over {second}s"
+    elif category == FLUSH:
+        return f"Flush, {first} high"
+    elif category == STRAIGHT:
+        return f"Straight, {first} high"
+    elif category == THREE_OF_A_KIND:
+        return f"Three of a kind, {first}s"
+    elif category == TWO_PAIR:
+        return f"Two pair, {first}s and {second}s"
+    elif category == ONE_PAIR:
+        return f"One pair, {first}s"
+    else:
+        return f"{first} high"
+
+
+DESCRIPTIONS = {}  # 강도 -> 족보 설명 (처음 나온 강도만 만들어 두고 이후에는 조회)
+
+
+def describe(strength):
+    description = DESCRIPTIONS.get(strength)
+    if description is None:
+        description = DESCRIPTIONS[strength] = _describe(strength)
+    return description
@@ -1,157 +1,342 @@
 import random
-from collections import deque, Counter
-from itertools import combinations
-from card import Deck
+from card import Deck, CARD_NAMES
+from evaluator import evaluate, best_five, best_five_indices, describe
+import numpy as np
+from preflop import load_preflop_table
+from equity_cache import EquityCache, canonical_key
+from instrumentation import timed
+from history import BET, BOARD, FOLD, HISTORY_DEPTH, HOLE, SCORES, STATE, History
+from equity import EquityResult, adaptive_equity, auto_equity, batch_equity, exact_equity, parallel_equity
+from hand_range import range_equity
+from icm import all_in_equity, icm_equity
+from showdown import HandState, settle
+BET_UNIT = 10  # 프리플랍/플랍의 레이즈 단위 (턴/리버는 두 배)
+MAX_RAISES = 3  # 스트리트당 최대 레이즈 횟수
+ACT_FOLD, ACT_CALL, ACT_RAISE = "fold", "call", "raise"  # 베팅 라운드의 행동 (콜할 금액이 없으면 콜은 체크)
+
+
+def raise_size(street):
+    return BET_UNIT * (2 if street >= 2 else 1)  # street: 0 프리플랍, 1 플랍, 2 턴, 3 리버
+
+
+def seats_after(active, seat):
+    return [other for other in active if other > seat] + [other for other in active if other < seat]  # seat 다음 순서
+
 
 class HoldemGame:
-    def __init__(self, players):
+    def __init__(self, players, equity_cache=None, instrumentation=None, history_depth=HISTORY_DEPTH, hand_log=None,
+                 equity_client=None):
         self.players = players  # 플레이어 목록
+        self.history = History(history_depth)  # 델타 기반 실행 취소 / 다시 실행 히스토리
+        self.deck = Deck()  # 재사용하는 덱
+        self.instrumentation = instrumentation  # 단계별 계측 (None이면 꺼짐)
+        self.equity_cache = equity_cache if equity_cache is not None else EquityCache()  # 승률 결과 LRU 캐시
+        self.preflop_table = load_preflop_table()  # 모든 게임이 공유하는 프리플랍 승률 테이블 (파일이 없으면 None)
+        self.hand_log = hand_log  # 끝난 핸드를 기록할 HandLogWriter (None이면 기록하지 않음)
+        self.equity_client = equity_client  # 승률 계산 데몬 클라이언트 (mode="service"에서 사용)
+        self.hand_number = 0  # reset_game마다 증가하는 핸드 번호
+        self.hand_logged = True  # 아직 진행한 핸드가 없으므로 기록할 것도 없음
         self.reset_game()
 
     def reset_game(self):
-        self.deck = Deck()  # 새로운 덱을 생성
+        self.finish_hand()  # 이전 핸드가 끝났으면 로그에 남김
+        self.deck.reset()  # 덱을 제자리에서 초기화
         self.pot = 0  # 현재 판에 걸린 총 금액
-        self.table_cards = []  # 테이블에 공개된 카드 목록
+        self.table_cards = []  # 테이블에 공개된 카드 목록 (정수 코드)
         self.current_bet = 0  # 현재 베팅 금액
         self.scores = {}  # 각 플레이어의 점수
-        self.history = deque()  # 게임의 히스토리
+        self.history.clear()  # 새 핸드에서는 이전 핸드의 히스토리를 버림
+        self.hand_states = [HandState() for _ in self.players]  # 플레이어별 증분 평가 상태 (홀 카드 + 보드)
         self.state = "start"  # 현재 게임 상태
+        self.hand_number += 1
+        self.actions = []  # 베팅 라운드의 행동 기록 [(스트리트, 좌석, 행동), ...]
+        self.to_act = []  # 현재 베팅 라운드에서 아직 행동할 좌석 (맨 앞이 지금 차례)
+        self.street_raises = 0  # 현재 스트리트의 레이즈 횟수
+        self.hand_logged = False  # 이번 핸드를 로그에 기록했는지
 
         for player in self.players:
             player.hand = []  # 각 플레이어의 손에 있는 카드를 초기화
             player.current_bet = 0  # 각 플레이어의 현재 베팅 금액을 초기화
             player.folded = False  # 각 플레이어의 폴드 상태를 초기화
 
+    def finish_hand(self):
+        # 끝난 핸드(한 명만 남았거나 리버까지 공개)를 한 번만 로그에 남김 - 중간에 중단된 핸드는 기록하지 않음
+        if self.hand_log is None or self.hand_logged or not any(player.hand for player in self.players):
+            return False
+        live = [seat for seat, player in enumerate(self.players) if not player.folded]
+        strength = 0
+        if len(live) == 1:
+            winners = live  # 나머지가 모두 폴드
+        elif len(self.table_cards) == 5:
+            strengths = {seat: self.hand_states[seat].strength() for seat in live}
+            strength = max(strengths.values())
+            winners = [seat for seat in live if strengths[seat] == strength]  # 쇼다운 (무승부면 여러 명)
+        else:
+            return False
+        self.hand_log.append([player.hand for player in self.players], self.table_cards,
+                             [player.current_bet for player in self.players],
+                             [player.folded for player in self.players], winners, strength, self.pot)
+        self.hand_logged = True
+        return True
+
+    def close(self):
+        # 세션 종료: 마지막 핸드를 기록하고 로그 버퍼를 파일에 씀
+        self.finish_hand()
+        if self.hand_log is not None:
+            self.hand_log.close()
+
+    @timed("start_game")
     def start_game(self):
-        self.history.append((self.players.copy(), self.table_cards.copy()))  # 현재 상태를 히스토리에 저장
+        deltas = []
         for _ in range(2):
-            for player in self.players:
-                player.receive_card(self.deck.deal())  # 각 플레이어에게 2장의 카드를 나눠줌
+            for seat, player in enumerate(self.players):
+                card = self.deck.deal()
+                player.receive_card(card)  # 각 플레이어에게 2장의 카드를 나눠줌
+                self.hand_states[seat].add(card)
+                deltas.append((HOLE, seat, card))
+        deltas.append((STATE, self.state, "start"))
         self.state = "start"
+        self.history.record(deltas)  # 바뀐 부분만 히스토리에 저장
 
+    @timed("reveal_flop")
     def reveal_flop(self):
         if self.state != "start":
             raise Exception("플랍을 먼저 공개해야 합니다.")  # 현재 상태가 'start'가 아니면 예외를 발생시킴
-        self.history.append((self.players.copy(), self.table_cards.copy()))  # 현재 상태를 히스토리에 저장
-        self.table_cards.extend([self.deck.deal() for _ in range(3)])  # 테이블에 3장의 카드를 공개
-        self.state = "flop"
+        self._reveal(3, "flop")  # 테이블에 3장의 카드를 공개
 
+    @timed("reveal_turn")
     def reveal_turn(self):
         if self.state != "flop":
             raise Exception("턴을 공개하려면 플랍을 먼저 공개해야 합니다.")  # 현재 상태가 'flop'이 아니면 예외를 발생시킴
-        self.history.append((self.players.copy(), self.table_cards.copy()))  # 현재 상태를 히스토리에 저장
-        self.table_cards.append(self.deck.deal())  # 테이블에 1장의 카드를 추가로 공개
-        self.state = "turn"
+        self._reveal(1, "turn")  # 테이블에 1장의 카드를 추가로 공개
 
+    @timed("reveal_river")
     def reveal_river(self):
         if self.state != "turn":
             raise Exception("리버를 공개하려면 턴을 먼저 공개해야 합니다.")  # 현재 상태가 'turn'이 아니면 예외를 발생시킴
-        self.history.append((self.players.copy(), self.table_cards.copy()))  # 현재 상태를 히스토리에 저장
-        self.table_cards.append(self.deck.deal())  # 테이블에 1장의 카드를 추가로 공개
-        self.state = "river"
+        self._reveal(1, "river")  # 테이블에 1장의 카드를 추가로 공개
+
+    def _reveal(self, count, state):
+        deltas = []
+        for _ in range(count):
+            card = self.deck.deal()
+            self.table_cards.append(card)
+            for hand_state in self.hand_states:
+                hand_state.add(card)  # 새로 공개된 카드만 각 플레이어의 평가 상태에 더함
+            deltas.append((BOARD, card))
+        deltas.append((STATE, self.state, state))
+        self.state = state
+        self.history.record(deltas)  # 바뀐 부분만 히스토리에 저장
+
+    def bet(self, seat, amount):
+        player = self.players[seat]
+        if player.folded:
+            raise Exception("폴드한 플레이어는 베팅할 수 없습니다.")
+        new_current_bet = max(self.current_bet, player.current_bet + amount)
+        self.history.record([(BET, seat, amount, self.current_bet, new_current_bet)])
+        player.current_bet += amount  # 플레이어의 현재 베팅 금액 증가
+        self.pot += amount  # 팟에 금액 추가
+        self.current_bet = new_current_bet
+
+    def fold(self, seat):
+        if self.players[seat].folded:
+            return
+        self.history.record([(FOLD, seat)])
+        self.players[seat].folded = True  # 플레이어를 폴드 상태로 표시
+
+    @property
+    def street(self):
+        return (0, 0, 0, 1, 2, 3)[len(self.table_cards)]  # 0 프리플랍, 1 플랍, 2 턴, 3 리버
+
+    def betting_round(self, decide):
+        # 폴드하지 않은 좌석이 0번부터 차례로 decide(game, seat) -> ACT_FOLD/ACT_CALL/ACT_RAISE로 행동 (리밋 베팅)
+        street = self.street
+        self.to_act = [seat for seat, player in enumerate(self.players) if not player.folded]
+        self.street_raises = 0
+        while self.to_act and sum(not player.folded for player in self.players) > 1:
+            seat = self.to_act[0]
+            action = decide(self, seat)
+            self.to_act.pop(0)
+            to_call = self.current_bet - self.players[seat].current_bet
+            if action == ACT_FOLD and to_call > 0:
+                self.fold(seat)
+            elif action == ACT_RAISE and self.street_raises < MAX_RAISES:
+                self.bet(seat, to_call + raise_size(street))
+                self.street_raises += 1
+                active = [other for other, player in enumerate(self.players) if not player.folded]
+                self.to_act = seats_after(active, seat)  # 레이즈하면 다른 좌석이 모두 다시 행동
+            else:
+                action = ACT_CALL  # 콜할 금액이 없으면 체크, 레이즈 한도에 도달하면 콜
+                if to_call:
+                    self.bet(seat, to_call)
+            self.actions.append((street, seat, action))
+        self.to_act = []
 
     def show_table(self):
-        return ', '.join(map(str, self.table_cards))  # 테이블에 공개된 카드 목록을 문자열로 반환
+        return ', '.join(CARD_NAMES[card] for card in self.table_cards)  # 테이블에 공개된 카드 목록을 문자열로 반환
 
+    @timed("calculate_scores")
     def calculate_scores(self):
-        self.history.append((self.players.copy(), self.table_cards.copy()))  # 현재 상태를 히스토리에 저장
-        for player in self.players:
-            best_hand = self.get_best_hand(player.hand + self.table_cards)  # 플레이어의 최상의 핸드를 계산
-            self.scores[player.name] = self.hand_rank(best_hand)  # 플레이어의 점수를 저장
+        previous = dict(self.scores)
+        for player, hand_state in zip(self.players, self.hand_states):
+            self.scores[player.name] = hand_state.strength()  # 증분 상태에서 바로 최상의 핸드 강도를 조회
+        self.history.record([(SCORES, previous, dict(self.scores))])  # 이전 점수와 새 점수만 히스토리에 저장
+        if self.instrumentation is not None:
+            self.instrumentation.count("evaluations", len(self.players))
 
     def hand_rank(self, hand):
-        ranks = sorted([card.value() for card in hand], reverse=True)  # 카드의 랭크 값을 정렬
-        suits = [card.suit for card in hand]  # 카드의 슈트 목록
-
-        is_flush = len(set(suits)) == 1  # 플러시 여부 확인
-        is_straight = ranks == list(range(ranks[0], ranks[0] - 5, -1))  # 스트레이트 여부 확인
-
-        rank_counts = Counter(ranks)  # 카드 랭크의 빈도수 계산
-        counts = sorted(rank_counts.values(), reverse=True)  # 빈도수를 내림차순으로 정렬
-        unique_ranks = sorted(rank_counts.keys(), reverse=True)  # 유니크한 랭크 값을 내림차순으로 정렬
-
-        if is_flush and is_straight:
-            return (8, unique_ranks)  # 스트레이트 플러시
-        elif counts == [4, 1]:
-            return (7, unique_ranks)  # 포카드
-        elif counts == [3, 2]:
-            return (6, unique_ranks)  # 풀하우스
-        elif is_flush:
-            return (5, unique_ranks)  # 플러시
-        elif is_straight:
-            return (4, unique_ranks)  # 스트레이트
-        elif counts == [3, 1, 1]:
-            return (3, unique_ranks)  # 트리플
-        elif counts == [2, 2, 1]:
-            return (2, unique_ranks)  # 투페어
-        elif counts == [2, 1, 1, 1]:
-            return (1, unique_ranks)  # 원페어
-        else:
-            return (0, unique_ranks)  # 하이카드
+        if self.instrumentation is not None:
+            self.instrumentation.count("evaluations")
+        return evaluate(hand)  # 핸드 강도를 정수로 반환 (클수록 강함)
 
+    @timed("get_best_hand")
     def get_best_hand(self, cards):
-        if len(cards) < 5:
-            return cards  # 카드가 5장 미만일 경우 그대로 반환
-        return max(combinations(cards, 5), key=self.hand_rank)  # 최상의 5장 조합을 반환
+        if self.instrumentation is not None:
+            self.instrumentation.count("evaluations", 1 if len(cards) > 5 else 0)
+        return best_five(cards)  # 최상의 5장 조합을 반환 (5장 이하일 경우 그대로 반환)
 
-    def determine_winner(self):
+    def best_hand_indices(self, seat):
+        # 증분 상태의 강도로 (홀 카드 + 보드)에서 최상의 5장 위치를 바로 찾음
+        return best_five_indices(self.players[seat].hand + self.table_cards, self.hand_strength(seat))
+
+    def showdown(self):
         self.calculate_scores()  # 점수를 계산
-        winner = max(self.scores, key=lambda name: self.scores[name])  # 가장 높은 점수를 가진 플레이어를 승자로 설정
+        strengths = [None if player.folded else self.scores[player.name] for player in self.players]
+        return settle(strengths, [player.current_bet for player in self.players],
+                      [player.folded for player in self.players])  # 무승부를 포함한 순위와 사이드 팟 분배
+
+    def determine_winner(self):
+        result = self.showdown()
+        if not result.winners:
+            raise Exception("쇼다운에 남은 플레이어가 없습니다.")
+        winner = self.players[result.winners[0]].name  # 무승부면 앞 좌석의 플레이어 (전체 목록은 showdown()으로)
         return winner, self.scores[winner]  # 승자와 점수를 반환
 
-    def calculate_win_probability(self):
-        remaining_deck = self.deck.cards.copy()  # 남은 덱을 복사
-        total_simulations = 1000  # 시뮬레이션 횟수
-        win_counts = {player.name: 0 for player in self.players}  # 각 플레이어의 승리 횟수 초기화
+    @timed("calculate_equity")
+    def calculate_equity(self, total_simulations=100000, mode="auto", seed=None, workers=None,
+                         target_error=0.5, time_limit_ms=None):
+        if mode == "preflop":
+            # 무작위 상대 기준의 테이블 조회 (상대의 실제 홀 카드는 반영하지 않으므로 auto에서는 쓰지 않음)
+            result = self.preflop_equity()
+            if result is None:
+                raise Exception("프리플랍 승률 테이블을 사용할 수 없습니다.")
+            if self.instrumentation is not None:
+                self.instrumentation.count("preflop_table_lookups")
+            return result
+        key = self.equity_cache_key(mode, total_simulations, seed, workers, target_error, time_limit_ms)
+        result = self.equity_cache.get(key)  # 같거나 슈트만 다른 상태는 캐시에서 바로 반환
+        if result is None:
+            result = self._simulate_equity(mode, total_simulations, seed, workers, target_error, time_limit_ms)
+            self.equity_cache.put(key, result)
+            if self.instrumentation is not None:
+                self.instrumentation.count("equity_trials", result.trials)
+                self.instrumentation.count("evaluations", result.trials * len(self.players))
+        elif self.instrumentation is not None:
+            self.instrumentation.count("equity_cache_hits")
+        return result
+
+    def equity_cache_key(self, *params):
+        hole_cards = [player.hand for player in self.players]
+        return (canonical_key(hole_cards, self.table_cards),) + params  # 슈트 정규화된 상태 + 계산 옵션
+
+    def _simulate_equity(self, mode, total_simulations, seed, workers, target_error, time_limit_ms):
+        hole_cards = [player.hand for player in self.players]
+        if mode == "auto":
+            return auto_equity(hole_cards, self.table_cards, self.deck.cards, total_simulations,
+                               rng=np.random.default_rng(seed))  # 경우의 수에 따라 자동 선택
+        if mode == "exact":
+            return exact_equity(hole_cards, self.table_cards, self.deck.cards)  # 남은 보드 전수 조사
+        if mode == "batch":
+            return batch_equity(hole_cards, self.table_cards, self.deck.cards, total_simulations,
+                                np.random.default_rng(seed))  # NumPy 배치 시뮬레이션
+        if mode == "parallel":
+            return parallel_equity(hole_cards, self.table_cards, self.deck.cards, total_simulations,
+                                   workers, seed)  # 멀티 프로세스 시뮬레이션
+        if mode == "adaptive":
+            return adaptive_equity(hole_cards, self.table_cards, self.deck.cards, target_error,
+                                   time_limit_ms=time_limit_ms, max_trials=total_simulations,
+                                   rng=np.random.default_rng(seed))  # 목표 정밀도에 도달하면 정지
+        if mode == "service":
+            if self.equity_client is None:
+                raise Exception("승률 계산 데몬 클라이언트가 설정되지 않았습니다.")
+            return self.equity_client.equity(hole_cards, self.table_cards, total_simulations)  # 데몬에 계산을 맡김
+        if mode == "loop":
+            return self._loop_equity(hole_cards, total_simulations)  # 순수 파이썬 시뮬레이션
+        raise ValueError(f"알 수 없는 승률 계산 모드입니다: {mode}")
+
+    def preflop_equity(self):
+        opponents = len(self.players) - 1
+        if self.preflop_table is None or self.table_cards or not 1 <= opponents <= self.preflop_table.max_opponents:
+            return None  # 테이블로 답할 수 없는 상태
+        if any(len(player.hand) != 2 for player in self.players):
+            return None  # 아직 홀 카드를 받지 않음
+        entries = [self.preflop_table.lookup(player.hand[0], player.hand[1], opponents) for player in self.players]
+        return EquityResult([entry[0] for entry in entries], [entry[1] for entry in entries],
+                            [entry[2] for entry in entries], self.preflop_table.trials)
+
+    def hand_strength(self, seat):
+        return self.hand_states[seat].strength()  # 지금까지 공개된 카드로 만든 핸드 강도
+
+    def player_description(self, seat):
+        return describe(self.hand_strength(seat))  # 다시 평가하지 않고 증분 상태로 족보 설명 생성
+
+    def _loop_equity(self, hole_cards, total_simulations):
+        remaining_deck = self.deck.cards  # 남은 덱
+        missing = 5 - len(self.table_cards)  # 공개되지 않은 테이블 카드 수
+        wins = [0] * len(hole_cards)
+        ties = [0] * len(hole_cards)
+        shares = [0.0] * len(hole_cards)
+        states = self.hand_states if hole_cards == [player.hand for player in self.players] \
+            else [HandState(hand + self.table_cards) for hand in hole_cards]  # 홀 카드 + 공개된 보드는 이미 반영됨
 
         for _ in range(total_simulations):
-            random.shuffle(remaining_deck)  # 남은 덱을 섞음
-            for player in self.players:
-                simulated_hand = player.hand + self.table_cards + remaining_deck[:5-len(self.table_cards)]  # 시뮬레이션 핸드 생성
-                best_hand = self.get_best_hand(simulated_hand)  # 최상의 핸드 계산
-                win_counts[player.name] += self.hand_rank(best_hand)[0]  # 승리 횟수 증가
+            runout = random.sample(remaining_deck, missing)  # 남은 테이블 카드를 무작위로 채움
+            strengths = [state.strength_with(runout) for state in states]  # 새로 채운 카드만 더해 평가
+            best = max(strengths)
+            winners = [i for i, strength in enumerate(strengths) if strength == best]
+            for i in winners:
+                if len(winners) == 1:
+                    wins[i] += 1
+                else:
+                    ties[i] += 1
+                shares[i] += 1 / len(winners)  # 무승부일 경우 승리를 나눠 가짐
 
-        total_score = sum(win_counts.values())  # 총 승리 횟수 계산
-        for player in self.players:
-            win_counts[player.name] = (win_counts[player.name] / total_score) * 100  # 승리 확률 계산
+        to_percent = lambda counts: [count / total_simulations * 100 for count in counts]
+        return EquityResult(to_percent(wins), to_percent(ties), to_percent(shares), total_simulations)
 
-        return win_counts
+    @timed("calculate_win_probability")
+    def calculate_win_probability(self, total_simulations=100000, mode="auto", seed=None, workers=None,
+                                  target_error=0.5, time_limit_ms=None):
+        result = self.calculate_equity(total_simulations, mode, seed, workers, target_error, time_limit_ms)  # 플레이어별 승리/무승부 확률 계산
+        return {player.name: result.equity[i] for i, player in enumerate(self.players)}  # 플레이어별 에퀴티 (%)
 
-    def hand_description(self, hand):
-        ranks = sorted([card.value() for card in hand], reverse=True)  # 카드의 랭크 값을 정렬
-        suits = [card.suit for card in hand]  # 카드의 슈트 목록
-
-        is_flush = len(set(suits)) == 1  # 플러시 여부 확인
-        is_straight = ranks == list(range(ranks[0], ranks[0] - 5, -1))  # 스트레이트 여부 확인
-
-        rank_counts = Counter(ranks)  # 카드 랭크의 빈도수 계산
-        counts = sorted(rank_counts.values(), reverse=True)  # 빈도수를 내림차순으로 정렬
-        unique_ranks = sorted(rank_counts.keys(), reverse=True)  # 유니크한 랭크 값을 내림차순으로 정렬
-
-        rank_to_str = {14: 'A', 13: 'K', 12: 'Q', 11: 'J'}
-
-        best_rank_str = rank_to_str.get(unique_ranks[0], str(unique_ranks[0]))  # 가장 높은 랭크를 문자열로 변환
-
-        if is_flush and is_straight:
-            return f"Straight flush, {best_rank_str} high"
-        elif counts == [4, 1]:
-            return f"Four of a kind, {rank_to_str.get(unique_ranks[0], str(unique_ranks[0]))}s"
-        elif counts == [3, 2]:
-            return f"Full house, {rank_to_str.get(unique_ranks[0], str(unique_ranks[0]))}s over {rank_to_str.get(unique_ranks[1], str(unique_ranks[1]))}s"
-        elif is_flush:
-            return f"Flush, {best_rank_str} high"
-        elif is_straight:
-            return f"Straight, {best_rank_str} high"
-        elif counts == [3, 1, 1]:
-            return f"Three of a kind, {rank_to_str.get(unique_ranks[0], str(unique_ranks[0]))}s"
-        elif counts == [2, 2, 1]:
-            return f"Two pair, {rank_to_str.get(unique_ranks[0], str(unique_ranks[0]))}s and {rank_to_str.get(unique_ranks[1], str(unique_ranks[1]))}s"
-        elif counts == [2, 1, 1, 1]:
-            return f"One pair, {rank_to_str.get(unique_ranks[0], str(unique_ranks[0]))}s"
+    def calculate_range_equity(self, ranges, total_simulations=100000, seed=None):
+        # ranges: {플레이어 이름: 레인지 문자열} - 지정된 플레이어는 실제 홀 카드 대신 레인지로 계산
+        players = [ranges.get(player.name, player.hand) for player in self.players]
+        result = range_equity(players, self.table_cards, trials=total_simulations, rng=np.random.default_rng(seed))
+        return {player.name: result.equity[i] for i, player in enumerate(self.players)}  # 플레이어별 에퀴티 (%)
+
+    def calculate_icm_equity(self, stacks, payouts, other_stacks=(), total_simulations=100000, seed=None):
+        # 폴드하지 않은 플레이어가 모두 올인했을 때의 상금 에퀴티 {이름: 상금}
+        # stacks: {플레이어 이름: 남은 칩}, other_stacks: 다른 테이블에 남은 플레이어들의 칩
+        all_stacks = [stacks[player.name] for player in self.players] + list(other_stacks)
+        seats = [seat for seat, player in enumerate(self.players) if not player.folded]
+        if len(seats) < 2:
+            equity = icm_equity(all_stacks, payouts)
         else:
-            return f"{rank_to_str.get(unique_ranks[0], str(unique_ranks[0]))} high"
+            # 쇼다운 에퀴티는 남은 좌석끼리만 계산 (폴드한 홀 카드는 덱에서 빠진 데드 카드)
+            result = auto_equity([self.players[seat].hand for seat in seats], self.table_cards, self.deck.cards,
+                                 total_simulations, rng=np.random.default_rng(seed))
+            equity = all_in_equity(all_stacks, payouts, seats, result.equity)
+        return {player.name: equity[seat] for seat, player in enumerate(self.players)}
 
+    def hand_description(self, hand):
+        return describe(evaluate(hand))  # 핸드 강도로부터 족보 설명을 생성
+
+    @timed("undo")
     def undo(self):
-        if self.history:
-            previous_state = self.history.pop()  # 이전 상태를 히스토리에서 꺼냄
-            self.players, self.table_cards = previous_state  # 이전 상태로 복원
+        return self.history.undo(self)  # 마지막 행동의 델타를 거꾸로 적용
+
+    @timed("redo")
+    def redo(self):
+        return self.history.redo(self)  # 실행 취소한 행동의 델타를 다시 적용
@@ -1,9 +1,17 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox, simpledialog
-from PIL import Image, ImageTk
+from PIL import ImageTk
+from card_atlas import card_box, load_atlas
+from equity import EXACT_THRESHOLD, count_runouts, exact_equity, iter_equity
 from game import HoldemGame
 from player import Player
 
+EQUITY_POLL_MS = 50  # 백그라운드 승률 계산 결과를 확인하는 간격 (ms)
+EQUITY_TARGET_ERROR = 0.1  # 승률 표시를 더 이상 갱신하지 않을 신뢰구간 반폭 (%)
+EQUITY_MAX_TRIALS = 2000000  # 백그라운드 승률 계산의 최대 시뮬레이션 수
+
 
 class PokerGUI:
     def __init__(self, master):
@@ -18,18 +26,22 @@ class PokerGUI:
         self.card_images = {}
         self.load_card_images()  # 카드 이미지 로드
 
+        self.equity_results = queue.Queue()  # 백그라운드 작업이 보낸 (작업 번호, 승률 결과)
+        self.equity_job = 0  # 현재 유효한 승률 계산 작업 번호
+        self.equity_cancel = None  # 현재 작업의 취소 이벤트
+        self.equity_key = None  # 현재 작업 결과를 저장할 캐시 키
+
         self.setup_ui()  # UI 설정
 
     def load_card_images(self):
-        suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']
-        for suit in suits:
-            for rank in ranks:
-                card_name = f"{rank}_of_{suit}.png"
-                image_path = f"images/{card_name}"
-                image = Image.open(image_path)
-                image = image.resize((100, 150))  # 이미지 크기 조정
-                self.card_images[f"{rank} of {suit}"] = ImageTk.PhotoImage(image)  # 카드 이미지를 딕셔너리에 저장
+        self.card_atlas = load_atlas()  # 크기를 줄인 52장이 담긴 아틀라스를 한 번만 읽음
+
+    def card_image(self, code):
+        image = self.card_images.get(code)
+        if image is None:
+            image = ImageTk.PhotoImage(self.card_atlas.crop(card_box(code)))  # 처음 표시할 때 PhotoImage 생성
+            self.card_images[code] = image  # 카드 코드를 키로 이미지를 딕셔너리에 저장
+        return image
 
     def setup_ui(self):
         self.player_frame_top = tk.Frame(self.master)
@@ -94,6 +106,7 @@ class PokerGUI:
         self.reset_button.pack(side=tk.LEFT, padx=5)
 
         self.update_ui()
+        self.master.after(EQUITY_POLL_MS, self.poll_equity)  # 승률 결과 확인 루프 시작
 
     def reset(self):
         self.game.reset_game()  # 게임 초기화
@@ -123,31 +136,91 @@ class PokerGUI:
 
     def determine_winner(self):
         try:
-            winner, score = self.game.determine_winner()  # 승자 결정
-            hand_description = self.game.hand_description(self.game.get_best_hand(
-                self.players[[player.name for player in self.players].index(winner)].hand + self.game.table_cards))
-            messagebox.showinfo("Winner", f"Winner: {winner} with hand: {hand_description}")  # 승자 정보 표시
+            result = self.game.showdown()  # 무승부와 사이드 팟을 포함한 쇼다운
+            if not result.winners:
+                raise Exception("쇼다운에 남은 플레이어가 없습니다.")
+            winners = ", ".join(self.players[seat].name for seat in result.winners)
+            hand_description = self.game.player_description(result.winners[0])
+            message = f"Winner: {winners} with hand: {hand_description}"
+            if len(result.winners) > 1:
+                message += " (split pot)"
+            messagebox.showinfo("Winner", message)  # 승자 정보 표시
         except Exception as e:
             messagebox.showerror("Error", str(e))  # 예외 발생 시 에러 메시지 박스
 
     def update_ui(self):
         self.update_table_cards()  # 테이블 카드 업데이트
         self.update_player_hands()  # 플레이어 핸드 업데이트
-        win_probs = self.game.calculate_win_probability()  # 승리 확률 계산
         for i, player in enumerate(self.players):
-            self.prob_labels[i].config(text=f"{player.name}'s Win Probability: {win_probs[player.name]:.2f}%")
+            self.prob_labels[i].config(text=f"{player.name}'s Win Probability: calculating...")
             if len(self.game.table_cards) > 0:
-                best_hand = self.game.get_best_hand(player.hand + self.game.table_cards)
-                hand_description = self.game.hand_description(best_hand)
+                hand_description = self.game.player_description(i)  # 증분 평가 상태로 바로 조회
             else:
                 hand_description = "No table cards yet"
             self.hand_description_labels[i].config(text=f"Hand Description: {hand_description}")
+        self.equity_key = self.game.equity_cache_key("progressive", EQUITY_TARGET_ERROR, EQUITY_MAX_TRIALS)
+        cached = self.game.equity_cache.get(self.equity_key)
+        if cached is not None:
+            self.cancel_equity_job()
+            self.show_equity(cached)  # 이미 계산한 상태는 캐시에서 즉시 표시
+        else:
+            self.start_equity_job()  # 승률은 백그라운드에서 계산
+
+    def cancel_equity_job(self):
+        if self.equity_cancel is not None:
+            self.equity_cancel.set()  # 이전 상태의 계산 작업 취소
+        self.equity_job += 1
+
+    def start_equity_job(self):
+        self.cancel_equity_job()
+        self.equity_cancel = threading.Event()
+        hole_cards = [list(player.hand) for player in self.players]  # 작업 스레드에는 현재 상태의 복사본만 전달
+        board = list(self.game.table_cards)
+        remaining = list(self.game.deck.cards)
+        worker = threading.Thread(target=self.run_equity_job,
+                                  args=(self.equity_job, self.equity_cancel, hole_cards, board, remaining),
+                                  daemon=True)
+        worker.start()
+
+    def run_equity_job(self, job, cancel, hole_cards, board, remaining):
+        # 작업 스레드: Tk 위젯에 직접 접근하지 않고 결과를 큐에 넣음
+        if count_runouts(remaining, 5 - len(board)) <= EXACT_THRESHOLD:
+            self.equity_results.put((job, exact_equity(hole_cards, board, remaining), True))
+            return
+        result = None
+        for result in iter_equity(hole_cards, board, remaining, max_trials=EQUITY_MAX_TRIALS):
+            if cancel.is_set():
+                return  # 스트리트가 바뀌었거나 리셋됨
+            if max(result.error) <= EQUITY_TARGET_ERROR:
+                break
+            self.equity_results.put((job, result, False))  # 중간 추정치를 전달
+        self.equity_results.put((job, result, True))  # 최종 결과
+
+    def poll_equity(self):
+        latest = None
+        try:
+            while True:
+                job, result, finished = self.equity_results.get_nowait()
+                if job == self.equity_job:
+                    latest = result  # 취소된 작업의 결과는 버림
+                    if finished:
+                        self.game.equity_cache.put(self.equity_key, result)  # 최종 결과만 캐시에 저장
+        except queue.Empty:
+            pass
+        if latest is not None:
+            self.show_equity(latest)
+        self.master.after(EQUITY_POLL_MS, self.poll_equity)
+
+    def show_equity(self, result):
+        for i, player in enumerate(self.players):
+            error = f" (±{result.error[i]:.2f}%)" if result.error and result.error[i] else ""
+            self.prob_labels[i].config(text=f"{player.name}'s Win Probability: {result.equity[i]:.2f}%{error}")
 
     def update_table_cards(self):
         for i, card_label in enumerate(self.table_cards_labels):
             if i < len(self.game.table_cards):
                 card = self.game.table_cards[i]
-                card_label.config(image=self.card_images[str(card)])
+                card_label.config(image=self.card_image(card))
             else:
                 card_label.config(image='')
 
@@ -156,4 +229,4 @@ class PokerGUI:
             hand_frames = self.hand_frames[i]
             for j, card_label in enumerate(hand_frames):
                 card = player.hand[j]
-                card_label.config(image=self.card_images[str(card)])
+                card_label.config(image=self.card_image(card))
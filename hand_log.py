@@ -0,0 +1,196 @@
+# 고정 길이 바이너리 핸드 히스토리 로그
+#
+# 끝난 핸드 하나를 96바이트 정렬 레코드(홀 카드/보드 카드 바이트, 좌석별 베팅, 승자, 족보)로 만들어
+# 버퍼에 모았다가 한 번에 파일 끝에 쓴다. 파일이 max_bytes를 넘으면 다음 번호의 세그먼트로 넘어간다.
+# 읽을 때는 헤더 뒤를 NumPy 구조화 배열로 mmap하므로 복사 없이 수억 개의 레코드를 벡터 연산으로 훑을 수 있다.
+#
+# 사용법: python hand_log.py hands.hhl   (모든 세그먼트의 요약 통계 출력)
+import argparse
+import glob
+import os
+import struct
+import time
+
+import numpy as np
+
+from evaluator import CATEGORY_NAMES
+
+MAX_SEATS = 10  # 레코드에 담을 수 있는 최대 좌석 수
+NO_CARD = 255  # 비어 있는 카드 자리
+NO_SHOWDOWN = 255  # 쇼다운 없이 끝난 핸드의 족보 값
+ROTATE_BYTES = 256 * 1024 * 1024  # 세그먼트 하나의 최대 크기
+BUFFER_RECORDS = 1024  # 모았다가 한 번에 쓰는 레코드 수
+
+_MAGIC = b"HHLG"
+_VERSION = 2  # 2: board_count를 빼고 필드를 정렬해 96바이트로 맞춤
+_HEADER = struct.Struct("<4sHHH6x")  # magic, version, 레코드 크기, 최대 좌석 수 (16바이트)
+
+RECORD_DTYPE = np.dtype([
+    ("hand_id", "<u8"),  # 로그 전체에서 증가하는 핸드 번호
+    ("time", "<f8"),  # 기록 시각 (유닉스 시간)
+    ("strength", "<u4"),  # 이긴 핸드의 강도 (evaluator 형식)
+    ("pot", "<u4"),  # 최종 팟
+    ("bets", "<u4", MAX_SEATS),  # 좌석별 베팅 합계
+    ("winners", "<u2"),  # 팟을 가져간 좌석 비트마스크 (무승부면 여러 비트)
+    ("folded", "<u2"),  # 폴드한 좌석 비트마스크
+    ("players", "u1"),  # 좌석 수
+    ("winner", "i1"),  # 단독 승자 좌석 (무승부면 -1)
+    ("category", "u1"),  # 이긴 핸드의 족보 (쇼다운이 없으면 NO_SHOWDOWN)
+    ("board", "u1", 5),  # 보드 카드 코드 (공개되지 않은 자리는 NO_CARD)
+    ("hole", "u1", (MAX_SEATS, 2)),  # 좌석별 홀 카드 코드
+])  # 큰 필드부터 배치해 모든 필드가 자기 크기에 정렬된 96바이트
+
+
+def segment_path(path, index):
+    return f"{path}.{index:05d}"
+
+
+def log_segments(path):
+    # path로 시작하는 세그먼트 파일을 순서대로 반환
+    return sorted(glob.glob(glob.escape(path) + ".[0-9][0-9][0-9][0-9][0-9]"))
+
+
+def read_log(path):
+    # 세그먼트 하나를 읽기 전용 구조화 배열로 mmap (마지막의 잘린 레코드는 무시)
+    with open(path, "rb") as file:
+        header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"핸드 로그 헤더가 없습니다: {path}")
+    magic, version, record_size, max_seats = _HEADER.unpack(header)
+    if magic != _MAGIC or version != _VERSION or record_size != RECORD_DTYPE.itemsize or max_seats != MAX_SEATS:
+        raise ValueError(f"핸드 로그 형식이 올바르지 않습니다: {path}")
+    count = (os.path.getsize(path) - _HEADER.size) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=_HEADER.size, shape=(count,))
+
+
+def iter_records(path):
+    # 모든 세그먼트의 레코드를 차례로 반환 (각 레코드는 mmap을 가리키는 뷰)
+    for segment in log_segments(path):
+        yield from read_log(segment)
+
+
+def iter_segments(path):
+    # 세그먼트별 구조화 배열 (벡터 연산으로 훑을 때 사용)
+    for segment in log_segments(path):
+        yield read_log(segment)
+
+
+class HandLogWriter:
+    def __init__(self, path, max_bytes=ROTATE_BYTES, buffer_records=BUFFER_RECORDS):
+        if max_bytes < _HEADER.size + RECORD_DTYPE.itemsize:
+            raise ValueError(f"세그먼트 크기가 너무 작습니다: {max_bytes}")
+        self.path = path  # 세그먼트 파일 이름의 앞부분
+        self.max_bytes = max_bytes
+        self.buffer = np.zeros(buffer_records, dtype=RECORD_DTYPE)  # 쓰기 전 레코드를 모으는 버퍼
+        self.pending = 0  # 버퍼에 쌓인 레코드 수
+        self.file = None
+        segments = log_segments(path)
+        self.segment = 0
+        self.next_id = 0
+        if segments:
+            self.segment = int(segments[-1].rsplit(".", 1)[1])  # 마지막 세그먼트에 이어서 기록
+            last = read_log(segments[-1])
+            if len(last):
+                self.next_id = int(last[-1]["hand_id"]) + 1
+            del last
+        self._open()
+
+    def _open(self):
+        path = segment_path(self.path, self.segment)
+        self.file = open(path, "ab")
+        size = self.file.tell()
+        if size == 0:
+            self.file.write(_HEADER.pack(_MAGIC, _VERSION, RECORD_DTYPE.itemsize, MAX_SEATS))
+        else:
+            self.file.truncate(size - (size - _HEADER.size) % RECORD_DTYPE.itemsize)  # 중간에 끊긴 레코드 제거
+            self.file.seek(0, os.SEEK_END)
+
+    def append(self, hole_cards, board, bets, folded, winners, strength, pot):
+        # hole_cards/bets/folded: 좌석별 값, winners: 팟을 가져간 좌석 목록, strength: 이긴 핸드 강도 (없으면 0)
+        if len(hole_cards) > MAX_SEATS:
+            raise ValueError(f"좌석 수는 {MAX_SEATS} 이하여야 합니다: {len(hole_cards)}")
+        if not winners:
+            raise ValueError("승자가 정해진 (끝난) 핸드만 기록할 수 있습니다.")
+        record = self.buffer[self.pending]
+        record["hand_id"] = self.next_id
+        record["time"] = time.time()
+        record["players"] = len(hole_cards)
+        record["winner"] = winners[0] if len(winners) == 1 else -1
+        record["category"] = strength >> 20 if strength else NO_SHOWDOWN
+        record["winners"] = sum(1 << seat for seat in winners)
+        record["folded"] = sum(1 << seat for seat, flag in enumerate(folded) if flag)
+        record["strength"] = strength
+        record["pot"] = pot
+        record["board"] = NO_CARD
+        record["board"][:len(board)] = board
+        record["hole"] = NO_CARD
+        for seat, hand in enumerate(hole_cards):
+            record["hole"][seat, :len(hand)] = hand
+        record["bets"] = 0
+        record["bets"][:len(bets)] = bets
+        self.next_id += 1
+        self.pending += 1
+        if self.pending == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        # 버퍼의 레코드를 파일에 쓰고, 세그먼트가 가득 차면 다음 세그먼트로 넘어감
+        written = 0
+        while written < self.pending:
+            room = (self.max_bytes - self.file.tell()) // RECORD_DTYPE.itemsize
+            if room <= 0:
+                self.file.close()
+                self.segment += 1
+                self._open()
+                continue
+            count = min(room, self.pending - written)
+            self.file.write(self.buffer[written:written + count].tobytes())
+            written += count
+        self.pending = 0
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+
+def summarize(path):
+    # 모든 세그먼트를 벡터 연산으로 훑어 핸드 수, 쇼다운 비율, 족보 분포를 계산
+    start = time.perf_counter()
+    hands = 0
+    showdowns = 0
+    splits = 0
+    categories = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)
+    for records in iter_segments(path):
+        hands += len(records)
+        category = records["category"]
+        showdown = category != NO_SHOWDOWN
+        showdowns += int(showdown.sum())
+        splits += int((showdown & (records["winner"] < 0)).sum())
+        categories += np.bincount(category[showdown], minlength=len(CATEGORY_NAMES))[:len(CATEGORY_NAMES)]
+    return {
+        "hands": hands,
+        "showdowns": showdowns,
+        "splits": splits,
+        "categories": {name: int(count) for name, count in zip(CATEGORY_NAMES, categories)},
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="핸드 히스토리 로그 요약")
+    parser.add_argument("path", help="로그 경로 (세그먼트 번호를 뺀 앞부분)")
+    args = parser.parse_args()
+    summary = summarize(args.path)
+    print(f"핸드 {summary['hands']}개, 쇼다운 {summary['showdowns']}개, 무승부 {summary['splits']}개 "
+          f"({summary['seconds']:.3f}초)")
+    for name, count in summary["categories"].items():
+        print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
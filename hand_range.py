@@ -0,0 +1,306 @@
+# 핸드 레인지 파서와 레인지 대 레인지 승률 계산
+#
+# "JJ+, AKs, KQo:0.5, AhKh" 또는 "top 15%" 같은 문자열을 1326개 홀 카드 조합의 가중치 배열로 바꾸고,
+# 보드/데드 카드와 겹치는 조합을 걸러낸 결과를 레인지마다 캐시한다.
+# 승률은 헤즈업이고 경우의 수가 적으면 (조합 x 조합 x 남은 보드) 전수 조사, 아니면 카드 제거를 반영한
+# 가중 샘플링으로 계산하며, 조합마다 파이썬 루프를 돌지 않고 전부 배열 연산으로 처리한다.
+import re
+from collections import OrderedDict
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from equity import _CHUNK, EXACT_THRESHOLD, FILLER_HAND, EquityResult, _to_result, evaluate_cards, sample_runouts, tally
+from preflop import NUM_CLASSES, hand_class, load_preflop_table
+
+RANK_CHARS = "23456789TJQKA"  # 레인지 표기의 랭크 문자 (인코딩의 랭크 순서)
+SUIT_CHARS = "hdcs"  # Hearts, Diamonds, Clubs, Spades (인코딩의 슈트 순서)
+EXACT_RANGE_THRESHOLD = 5000000  # 남은 보드 x 조합 x 조합이 이 값 이하이면 전수 조사
+# 남은 보드 자체도 equity.EXACT_THRESHOLD 이하여야 함 (보드 나열은 파이썬 반복이라 프리플랍 전수 조사는 샘플링보다 느림)
+LIVE_CACHE_SIZE = 64  # 레인지마다 보관하는 데드 카드별 필터 결과 수
+_PAIR_BLOCK = 2000000  # 전수 조사에서 한 번에 비교하는 (보드 x 조합 x 조합) 원소 수
+_MAX_REJECTIONS = 1000  # 겹치는 조합을 다시 뽑는 최대 횟수
+
+COMBOS = np.array([(high, low) for high in range(52) for low in range(high)], dtype=np.intp)  # 1326개 조합 (카드 코드 쌍)
+COMBO_MASKS = (np.int64(1) << COMBOS[:, 0]) | (np.int64(1) << COMBOS[:, 1])  # 조합 -> 52비트 카드 마스크
+COMBO_CLASSES = np.array([hand_class(high, low) for high, low in COMBOS], dtype=np.intp)  # 조합 -> 프리플랍 클래스
+CLASS_COMBOS = [np.flatnonzero(COMBO_CLASSES == index) for index in range(NUM_CLASSES)]  # 클래스 -> 조합 번호 목록
+_COMBO_INDEX = {(int(high), int(low)): index for index, (high, low) in enumerate(COMBOS)}
+
+_PERCENT = re.compile(r"^(?:top\s*)?(\d+(?:\.\d+)?)%$")
+_PAIR = re.compile(r"^([2-9TJQKA])\1(\+)?$")
+_PAIR_SPAN = re.compile(r"^([2-9TJQKA])\1-([2-9TJQKA])\2$")
+_NON_PAIR = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)(\+)?$")
+_NON_PAIR_SPAN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)-([2-9TJQKA])([2-9TJQKA])([so]?)$")
+_SPECIFIC = re.compile(r"^([2-9TJQKA])([hdcs])([2-9TJQKA])([hdcs])$")
+_class_order = None  # 프리플랍 에퀴티 내림차순 클래스 순서 (상위 % 레인지용, 처음 쓸 때 계산)
+_parsed = {}  # 레인지 문자열 -> Range
+
+
+def cards_mask(cards):
+    mask = 0
+    for card in cards:
+        mask |= 1 << int(card)
+    return mask
+
+
+def combo_index(card1, card2):
+    high, low = max(card1, card2), min(card1, card2)
+    return _COMBO_INDEX[(int(high), int(low))]
+
+
+def _non_pair_classes(high, low, kind):
+    if high <= low:
+        raise ValueError(f"높은 랭크를 먼저 적어야 합니다: {RANK_CHARS[high]}{RANK_CHARS[low]}")
+    classes = []
+    if kind in ("", "s"):
+        classes.append(high * 13 + low)  # 수딧
+    if kind in ("", "o"):
+        classes.append(low * 13 + high)  # 오프수딧
+    return classes
+
+
+def top_classes(percent):
+    # 무작위 상대 1명에 대한 프리플랍 에퀴티가 높은 순으로 전체 조합의 percent%를 채우는 클래스 목록
+    global _class_order
+    if _class_order is None:
+        table = load_preflop_table()
+        if table is None:
+            raise ValueError("프리플랍 승률 테이블이 없어 상위 % 레인지를 만들 수 없습니다.")
+        equity = [table.lookup(*[int(card) for card in COMBOS[CLASS_COMBOS[index][0]]], 1)[2] for index in range(NUM_CLASSES)]
+        _class_order = sorted(range(NUM_CLASSES), key=lambda index: -equity[index])
+    target = len(COMBOS) * percent / 100
+    classes = []
+    total = 0
+    for index in _class_order:
+        if total >= target:
+            break
+        classes.append(index)
+        total += len(CLASS_COMBOS[index])
+    return classes
+
+
+def _token_combos(token):
+    # 레인지 토큰 하나를 조합 번호 배열로 변환
+    if token in ("any", "random", "*"):
+        return np.arange(len(COMBOS))
+    match = _SPECIFIC.match(token)
+    if match:
+        high, high_suit, low, low_suit = match.groups()
+        card1 = RANK_CHARS.index(high) * 4 + SUIT_CHARS.index(high_suit)
+        card2 = RANK_CHARS.index(low) * 4 + SUIT_CHARS.index(low_suit)
+        if card1 == card2:
+            raise ValueError(f"같은 카드를 두 번 쓸 수 없습니다: {token}")
+        return np.array([combo_index(card1, card2)])
+
+    match = _PERCENT.match(token)
+    if match:
+        classes = top_classes(float(match.group(1)))
+    elif _PAIR.match(token):
+        rank, plus = _PAIR.match(token).groups()
+        start = RANK_CHARS.index(rank)
+        classes = [rank * 13 + rank for rank in range(start, 13 if plus else start + 1)]
+    elif _PAIR_SPAN.match(token):
+        first, last = sorted(RANK_CHARS.index(rank) for rank in _PAIR_SPAN.match(token).groups())
+        classes = [rank * 13 + rank for rank in range(first, last + 1)]
+    elif _NON_PAIR.match(token):
+        high, low, kind, plus = _NON_PAIR.match(token).groups()
+        high, low = RANK_CHARS.index(high), RANK_CHARS.index(low)
+        lows = range(low, high) if plus else [low]  # ATs+ -> ATs, AJs, AQs, AKs
+        classes = [index for kicker in lows for index in _non_pair_classes(high, kicker, kind)]
+    elif _NON_PAIR_SPAN.match(token):
+        high, low, kind, last_high, last_low, last_kind = _NON_PAIR_SPAN.match(token).groups()
+        if high != last_high or kind != last_kind:
+            raise ValueError(f"범위의 양 끝은 높은 카드와 수딧 여부가 같아야 합니다: {token}")
+        high = RANK_CHARS.index(high)
+        first, last = sorted((RANK_CHARS.index(low), RANK_CHARS.index(last_low)))
+        classes = [index for kicker in range(first, last + 1) for index in _non_pair_classes(high, kicker, kind)]
+    else:
+        raise ValueError(f"레인지 표기를 해석할 수 없습니다: {token}")
+    if not classes:
+        return np.empty(0, dtype=np.intp)
+    return np.concatenate([CLASS_COMBOS[index] for index in classes])
+
+
+class Range:
+    def __init__(self, weights, text=None):
+        weights = np.asarray(weights, dtype=np.float64)
+        chosen = np.flatnonzero(weights > 0)
+        self.text = text  # 원래 레인지 문자열 (없으면 None)
+        self.indices = chosen  # 레인지에 포함된 조합 번호
+        self.combos = COMBOS[chosen]  # (조합 수 x 2) 카드 코드
+        self.weights = weights[chosen]  # 조합별 가중치
+        self.masks = COMBO_MASKS[chosen]  # 조합별 카드 마스크
+        self.live_cache = OrderedDict()  # 데드 카드 마스크 -> (combos, weights, masks)
+
+    @classmethod
+    def parse(cls, text):
+        # "JJ+, AKs, A5s-A2s, KQo:0.5, AhKh, top 15%" 형식 (쉼표로 구분, ':가중치'는 선택)
+        weights = np.zeros(len(COMBOS))
+        for token in text.replace(" ", "").split(","):
+            if not token:
+                continue
+            weight = 1.0
+            if ":" in token:
+                token, weight = token.split(":", 1)
+                weight = float(weight)
+            indices = _token_combos(_normalize(token))
+            weights[indices] = weight  # 나중에 나온 토큰의 가중치가 우선
+        return cls(weights, text)
+
+    @classmethod
+    def from_cards(cls, cards):
+        weights = np.zeros(len(COMBOS))
+        weights[combo_index(*cards)] = 1.0
+        return cls(weights)
+
+    def live(self, dead_mask):
+        # dead_mask의 카드와 겹치지 않는 조합만 남긴 결과 (데드 카드 조합별로 캐시)
+        entry = self.live_cache.get(dead_mask)
+        if entry is not None:
+            self.live_cache.move_to_end(dead_mask)
+            return entry
+        keep = (self.masks & np.int64(dead_mask)) == 0
+        entry = (self.combos[keep], self.weights[keep], self.masks[keep])
+        self.live_cache[dead_mask] = entry
+        if len(self.live_cache) > LIVE_CACHE_SIZE:
+            self.live_cache.popitem(last=False)
+        return entry
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __repr__(self):
+        return f"Range({self.text!r}, combos={len(self)})"
+
+
+def _normalize(token):
+    # 랭크 문자는 대문자로, 슈트와 s/o 표기는 소문자로 맞춤 ("aks" -> "AKs", "AHkh" -> "AhKh")
+    lowered = token.lower()
+    if lowered in ("any", "random", "*") or lowered.endswith("%"):
+        return lowered
+    return "".join(char.upper() if char.upper() in RANK_CHARS else char.lower() for char in token)
+
+
+def parse_range(text):
+    # 같은 문자열은 한 번만 파싱하고 블로커 필터 캐시도 공유
+    result = _parsed.get(text)
+    if result is None:
+        result = _parsed[text] = Range.parse(text)
+    return result
+
+
+def as_range(player):
+    # Range, 레인지 문자열, 또는 홀 카드 두 장을 Range로 변환
+    if isinstance(player, Range):
+        return player
+    if isinstance(player, str):
+        return parse_range(player)
+    return Range.from_cards(player)
+
+
+def _exact_heads_up(first, second, board, dead_mask):
+    # 두 레인지의 모든 (조합, 조합, 남은 보드)를 가중치와 함께 전수 조사
+    combos_a, weights_a, masks_a = first
+    combos_b, weights_b, masks_b = second
+    missing = 5 - len(board)
+    remaining = [card for card in range(52) if not dead_mask >> card & 1]
+    total = comb(len(remaining), missing)
+    pair_weights = np.outer(weights_a, weights_b) * ((masks_a[:, None] & masks_b[None, :]) == 0)  # 서로 겹치는 조합은 제외
+    board_cards = np.asarray(board, dtype=np.intp)
+    block = max(1, min(_CHUNK, _PAIR_BLOCK // (len(combos_a) * len(combos_b))))
+    win = tie = weight_sum = 0.0
+    runout_iter = combinations(remaining, missing)
+    done = 0
+    while done < total:
+        size = min(block, total - done)
+        flat = np.fromiter((card for _, runout in zip(range(size), runout_iter) for card in runout),
+                           dtype=np.intp, count=size * missing)
+        runouts = flat.reshape(size, missing)
+        run_masks = np.bitwise_or.reduce(np.int64(1) << runouts, axis=1) if missing else np.zeros(size, dtype=np.int64)
+        strengths = []
+        for combos, masks in ((combos_a, masks_a), (combos_b, masks_b)):
+            cards = np.concatenate([np.broadcast_to(combos, (size,) + combos.shape),
+                                    np.broadcast_to(board_cards, (size, len(combos), len(board))),
+                                    np.broadcast_to(runouts[:, None, :], (size, len(combos), missing))], axis=2)
+            valid = (masks[None, :] & run_masks[:, None]) == 0  # 남은 보드와 겹치는 조합은 제외
+            cards = cards.reshape(-1, 7)
+            cards[~valid.ravel()] = FILLER_HAND  # 카드가 중복된 행은 가중치가 0이므로 아무 유효한 핸드로 대체
+            strengths.append((evaluate_cards(cards).reshape(size, len(combos)), valid))
+        (strength_a, valid_a), (strength_b, valid_b) = strengths
+        weight = pair_weights[None, :, :] * valid_a[:, :, None] * valid_b[:, None, :]
+        diff = strength_a[:, :, None] - strength_b[:, None, :]
+        win += (weight * (diff > 0)).sum()
+        tie += (weight * (diff == 0)).sum()
+        weight_sum += weight.sum()
+        done += size
+    if weight_sum == 0:
+        raise ValueError("서로 겹치지 않는 조합이 없습니다.")
+    win, tie, lose = float(win), float(tie), float(weight_sum - win - tie)
+    weight_sum = float(weight_sum)
+    result = EquityResult([win / weight_sum * 100, lose / weight_sum * 100], [tie / weight_sum * 100] * 2,
+                          [(win + tie / 2) / weight_sum * 100, (lose + tie / 2) / weight_sum * 100], total)
+    result.error = [0.0, 0.0]  # 전수 조사이므로 오차 없음
+    return result
+
+
+def _pick_combos(live, size, rng):
+    # 플레이어마다 가중치에 비례해 조합을 뽑고, 서로 겹치는 행은 통째로 다시 뽑는다
+    cumulative = [np.cumsum(weights) / weights.sum() for _, weights, _ in live]
+    picks = np.empty((len(live), size), dtype=np.intp)
+    pending = np.arange(size)
+    for _ in range(_MAX_REJECTIONS):
+        for i, table in enumerate(cumulative):
+            picks[i, pending] = np.searchsorted(table, rng.random(len(pending)), side="right")
+        used = np.zeros(len(pending), dtype=np.int64)
+        valid = np.ones(len(pending), dtype=bool)
+        for i, (_, _, masks) in enumerate(live):
+            chosen = masks[picks[i, pending]]
+            valid &= (used & chosen) == 0
+            used |= chosen
+        pending = pending[~valid]
+        if not len(pending):
+            return picks
+    raise ValueError("서로 겹치지 않는 조합을 뽑지 못했습니다.")
+
+
+def _sample_range_totals(live, board, dead_mask, trials, rng):
+    missing = 5 - len(board)
+    wins = np.zeros(len(live))
+    ties = np.zeros(len(live))
+    shares = np.zeros(len(live))
+    board_cards = np.asarray(board, dtype=np.intp)
+    done = 0
+    while done < trials:
+        size = min(_CHUNK, trials - done)
+        picks = _pick_combos(live, size, rng)
+        used = np.full(size, dead_mask, dtype=np.int64)
+        for i, (_, _, masks) in enumerate(live):
+            used |= masks[picks[i]]
+        runouts = sample_runouts(used, missing, rng)  # 행마다 쓰인 카드를 제외한 남은 보드
+        fixed = np.concatenate([np.broadcast_to(board_cards, (size, len(board))), runouts], axis=1)
+        strengths = np.stack([evaluate_cards(np.concatenate([combos[picks[i]], fixed], axis=1))
+                              for i, (combos, _, _) in enumerate(live)])
+        chunk_wins, chunk_ties, chunk_shares = tally(strengths)
+        wins += chunk_wins
+        ties += chunk_ties
+        shares += chunk_shares
+        done += size
+    return wins, ties, shares
+
+
+def range_equity(players, board=(), dead=(), trials=100000, exact_threshold=EXACT_RANGE_THRESHOLD, rng=None):
+    # players: Range, 레인지 문자열, 또는 홀 카드 두 장의 목록 -> 플레이어별 가중 평균 승률
+    board = [int(card) for card in board]
+    dead_mask = cards_mask(board) | cards_mask(dead)
+    live = [as_range(player).live(dead_mask) for player in players]
+    for player, (combos, _, _) in zip(players, live):
+        if not len(combos):
+            raise ValueError(f"보드/데드 카드를 제외하면 남는 조합이 없습니다: {player}")
+    if len(live) == 2:
+        runouts = comb(52 - bin(dead_mask).count("1"), 5 - len(board))
+        if runouts <= EXACT_THRESHOLD and runouts * len(live[0][0]) * len(live[1][0]) <= exact_threshold:
+            return _exact_heads_up(live[0], live[1], board, dead_mask)
+    rng = rng if rng is not None else np.random.default_rng()
+    return _to_result(*_sample_range_totals(live, board, dead_mask, trials, rng), trials)
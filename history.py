@@ -0,0 +1,88 @@
+# 델타 기반 실행 취소 / 다시 실행 히스토리
+#
+# 행동 하나(카드 배분, 베팅, 폴드, 상태 전환 등)마다 전체 상태를 복사하는 대신 바뀐 부분만
+# 작은 튜플(델타)로 기록한다. 실행 취소 스택은 최대 깊이가 정해진 deque이므로
+# 긴 세션에서도 메모리 사용량이 일정하다.
+from collections import deque
+
+HISTORY_DEPTH = 64  # 기본 실행 취소 가능 횟수
+
+# 델타 종류
+HOLE = 0  # (HOLE, 좌석, 카드): 덱에서 플레이어에게 카드 한 장
+BOARD = 1  # (BOARD, 카드): 덱에서 테이블에 카드 한 장
+STATE = 2  # (STATE, 이전 상태, 새 상태)
+BET = 3  # (BET, 좌석, 금액, 이전 current_bet, 새 current_bet)
+FOLD = 4  # (FOLD, 좌석)
+SCORES = 5  # (SCORES, 이전 점수, 새 점수)
+
+
+def apply_delta(game, delta, forward):
+    kind = delta[0]
+    if kind == HOLE:
+        hand = game.players[delta[1]].hand
+        state = game.hand_states[delta[1]]
+        if forward:
+            card = game.deck.redeal()  # 되돌렸던 카드 delta[2]를 다시 나눠줌
+            hand.append(card)
+            state.add(card)
+        else:
+            state.remove(hand.pop())
+            game.deck.undeal()  # 카드를 덱으로 되돌림
+    elif kind == BOARD:
+        if forward:
+            card = game.deck.redeal()
+            game.table_cards.append(card)
+            for state in game.hand_states:
+                state.add(card)
+        else:
+            card = game.table_cards.pop()
+            for state in game.hand_states:
+                state.remove(card)
+            game.deck.undeal()
+    elif kind == STATE:
+        game.state = delta[2] if forward else delta[1]
+    elif kind == BET:
+        player = game.players[delta[1]]
+        amount = delta[2] if forward else -delta[2]
+        player.current_bet += amount
+        game.pot += amount
+        game.current_bet = delta[4] if forward else delta[3]
+    elif kind == FOLD:
+        game.players[delta[1]].folded = forward
+    elif kind == SCORES:
+        game.scores = dict(delta[2] if forward else delta[1])
+
+
+class History:
+    def __init__(self, depth=HISTORY_DEPTH):
+        self.undo_stack = deque(maxlen=depth)  # 행동별 델타 목록 (가장 오래된 항목은 자동으로 버려짐)
+        self.redo_stack = []
+
+    def record(self, deltas):
+        self.undo_stack.append(tuple(deltas))
+        self.redo_stack.clear()  # 새 행동이 생기면 다시 실행 목록은 무효
+
+    def undo(self, game):
+        if not self.undo_stack:
+            return False
+        deltas = self.undo_stack.pop()
+        for delta in reversed(deltas):
+            apply_delta(game, delta, False)
+        self.redo_stack.append(deltas)
+        return True
+
+    def redo(self, game):
+        if not self.redo_stack:
+            return False
+        deltas = self.redo_stack.pop()
+        for delta in deltas:
+            apply_delta(game, delta, True)
+        self.undo_stack.append(deltas)
+        return True
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def __len__(self):
+        return len(self.undo_stack)
@@ -0,0 +1,123 @@
+# 토너먼트 ICM(Independent Chip Model) 상금 에퀴티 계산
+#
+# 남은 플레이어 집합(비트마스크)마다 "지금까지의 순위가 정해지고 이 집합이 남을 확률"을 한 번씩만 계산하는
+# 부분집합 동적 계획법으로 팩토리얼 대신 O(2^n x n)에 끝낸다. 같은 인원의 집합을 한 층으로 묶어 NumPy로
+# 처리하므로 9명 파이널 테이블은 1ms 이내에 답한다. 인원이 더 많으면 지수분포 경주로 완주 순서를 샘플링한다.
+# 올인 상황에서는 calculate_win_probability의 쇼다운 에퀴티로 결과별 칩 분포를 가중해 상금 에퀴티로 바꾼다.
+from collections import OrderedDict
+
+import numpy as np
+
+ICM_EXACT_LIMIT = 18  # 이 인원 이하이면 정확한 동적 계획법, 초과하면 샘플링
+ICM_TRIALS = 200000  # 샘플링 근사의 완주 순서 수
+ICM_CACHE_SIZE = 1024  # (스택, 상금) -> 결과 캐시 항목 수
+
+_layouts = {}  # 인원 -> (층별 마스크 배열, 층별 멤버십 행렬)
+_results = OrderedDict()  # (스택, 상금, 방식) -> 플레이어별 상금 에퀴티
+
+
+def _layout(players):
+    # 남은 인원이 많은 층부터 (마스크, 멤버십 행렬, 한 명이 빠진 다음 마스크) 목록 (인원별로 한 번만 계산)
+    layout = _layouts.get(players)
+    if layout is None:
+        masks = np.arange(1 << players)
+        membership = ((masks[:, None] >> np.arange(players)) & 1).astype(bool)
+        counts = membership.sum(axis=1)
+        layout = []
+        for remaining in range(players, 0, -1):
+            layer = masks[counts == remaining]
+            members = membership[counts == remaining]
+            following = (layer[:, None] ^ (1 << np.arange(players)))[members]  # 멤버 한 명이 순위를 확정한 뒤의 마스크
+            layout.append((layer, members, following))
+        _layouts[players] = layout
+    return layout
+
+
+def _exact_icm(stacks, payouts):
+    # Malmuth-Harville: 남은 집합에서 스택에 비례한 확률로 다음 순위가 정해짐
+    players = len(stacks)
+    reach = np.zeros(1 << players)  # 마스크 -> 그 집합이 남을 확률
+    reach[-1] = 1.0
+    equity = np.zeros(players)
+    for place, (masks, members, following) in enumerate(_layout(players)[:len(payouts)]):
+        shares = members * stacks  # 층의 마스크 x 플레이어별 남은 스택
+        chance = shares * (reach[masks] / shares.sum(axis=1))[:, None]  # 플레이어가 이번 순위로 끝날 확률
+        equity += chance.sum(axis=0) * payouts[place]
+        if place + 1 < len(payouts):
+            reach += np.bincount(following, weights=chance[members], minlength=1 << players)
+    return equity
+
+
+def _sampled_icm(stacks, payouts, trials, rng):
+    # 비율이 스택인 지수분포 시간이 작은 순서가 Malmuth-Harville 완주 순서와 같은 분포
+    paid = len(payouts)
+    times = rng.exponential(size=(trials, len(stacks))) / stacks
+    order = np.argpartition(times, paid - 1, axis=1)[:, :paid] if paid < len(stacks) else times.argsort(axis=1)
+    order = np.take_along_axis(order, np.argsort(np.take_along_axis(times, order, axis=1), axis=1), axis=1)
+    equity = np.zeros(len(stacks))
+    for place in range(paid):
+        equity += np.bincount(order[:, place], minlength=len(stacks)) * payouts[place]
+    return equity / trials
+
+
+def icm_equity(stacks, payouts, exact_limit=ICM_EXACT_LIMIT, trials=ICM_TRIALS, rng=None):
+    # 플레이어별 스택과 순위별 상금 -> 플레이어별 상금 에퀴티 (스택이 0인 플레이어는 0)
+    stacks = [float(stack) for stack in stacks]
+    alive = [player for player, stack in enumerate(stacks) if stack > 0]
+    payouts = [float(payout) for payout in payouts][:len(alive)]  # 남은 인원보다 많은 상금 순위는 이미 확정
+    result = [0.0] * len(stacks)
+    if not alive or not payouts:
+        return result
+    exact = len(alive) <= exact_limit
+    key = (tuple(stacks), tuple(payouts), exact or trials)
+    cached = _results.get(key)
+    if cached is not None:
+        _results.move_to_end(key)
+        return list(cached)
+
+    alive_stacks = np.array([stacks[player] for player in alive])
+    if exact:
+        equity = _exact_icm(alive_stacks, payouts)
+    else:
+        equity = _sampled_icm(alive_stacks, payouts, trials, rng if rng is not None else np.random.default_rng())
+    for player, value in zip(alive, equity):
+        result[player] = float(value)
+    if exact:
+        _results[key] = tuple(result)  # 샘플링 결과는 난수에 따라 달라지므로 캐시하지 않음
+        if len(_results) > ICM_CACHE_SIZE:
+            _results.popitem(last=False)
+    return result
+
+
+def all_in_equity(stacks, payouts, seats, win_probabilities, **options):
+    # seats가 모두 올인했을 때의 상금 에퀴티
+    # win_probabilities: seats 순서의 쇼다운 에퀴티 (%) - 무승부는 에퀴티 몫으로 근사하고, 이긴 좌석은
+    # 상대마다 자기 스택까지만 가져감 (3명 이상에서 사이드 팟의 2등 분배는 무시)
+    total = sum(win_probabilities)
+    expected = np.zeros(len(stacks))
+    for winner, probability in zip(seats, win_probabilities):
+        if probability <= 0:
+            continue
+        after = list(stacks)
+        for loser in seats:
+            if loser != winner:
+                amount = min(stacks[winner], stacks[loser])
+                after[loser] -= amount
+                after[winner] += amount
+        expected += np.array(_equity_after_busts(stacks, after, payouts, **options)) * (probability / total)
+    return expected.tolist()
+
+
+def _equity_after_busts(before, after, payouts, **options):
+    # 남은 플레이어는 ICM으로, 이번 핸드에서 탈락한 플레이어는 남은 인원 바로 아래 순위의 상금을 받음
+    # (같은 핸드에서 여러 명이 탈락하면 시작 스택이 큰 쪽이 높은 순위, 시작 스택이 같으면 상금을 나눔)
+    equity = icm_equity(after, payouts, **options)
+    place = sum(1 for stack in after if stack > 0)
+    busted = [player for player in range(len(before)) if before[player] > 0 >= after[player]]
+    for stack in sorted(set(before[player] for player in busted), reverse=True):
+        group = [player for player in busted if before[player] == stack]
+        prize = sum(float(payout) for payout in payouts[place:place + len(group)]) / len(group)
+        for player in group:
+            equity[player] = prize
+        place += len(group)
+    return equity
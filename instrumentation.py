@@ -0,0 +1,130 @@
+# HoldemGame 단계별 계측 (카운터, 지연 시간 히스토그램, 느린 호출 프로파일링)
+#
+# HoldemGame(players, instrumentation=Instrumentation())으로 켠다. 꺼져 있으면 메서드 호출마다
+# 속성 확인 한 번만 추가되고, 켜져 있어도 호출마다 perf_counter 두 번과 이분 탐색 한 번이면 된다.
+import bisect
+import cProfile
+import functools
+import io
+import json
+import pstats
+import time
+
+# 지연 시간 히스토그램 버킷 경계 (초)
+LATENCY_BUCKETS = [0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 가장 큰 경계를 넘는 값 (+Inf)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ["+Inf"], self.counts)},
+        }
+
+
+class Instrumentation:
+    def __init__(self, profile_threshold_ms=None, on_profile=None):
+        self.timers = {}  # 단계 이름 -> Histogram
+        self.counters = {}  # 이벤트 이름 -> 누적 횟수
+        self.profile_threshold = None if profile_threshold_ms is None else profile_threshold_ms / 1000
+        self.on_profile = on_profile  # 프로파일이 캡처되면 (단계 이름, 경과 시간, 통계 문자열)로 호출
+        self.profiles = {}  # 단계 이름 -> 캡처된 cProfile 통계 문자열
+        self.armed = set()  # 다음 호출을 프로파일링할 단계
+        self.profiling = False  # cProfile이 실행 중인지 여부
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def call(self, name, func, *args, **kwargs):
+        # func를 실행하며 지연 시간을 기록. 임계값을 넘은 단계는 이후 호출을 cProfile로 감싸
+        # 다시 임계값을 넘는 호출 하나의 프로파일을 캡처
+        self.count(f"{name}_calls")
+        profiler = None
+        if name in self.armed and not self.profiling:
+            profiler = cProfile.Profile()  # 중첩된 단계는 바깥 프로파일에 포함되므로 따로 캡처하지 않음
+            self.profiling = True
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self.profiling = False
+                if elapsed >= self.profile_threshold:
+                    self.armed.discard(name)
+                    self._store_profile(name, elapsed, profiler)  # 느린 호출 하나만 보관
+            histogram = self.timers.get(name)
+            if histogram is None:
+                histogram = self.timers[name] = Histogram()
+            histogram.observe(elapsed)
+            if self.profile_threshold is not None and elapsed >= self.profile_threshold and name not in self.profiles:
+                self.armed.add(name)  # 같은 단계의 다음 느린 호출을 캡처
+
+    def _store_profile(self, name, elapsed, profiler):
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(25)
+        self.profiles[name] = output.getvalue()
+        if self.on_profile is not None:
+            self.on_profile(name, elapsed, self.profiles[name])
+
+    def reset(self):
+        self.timers.clear()
+        self.counters.clear()
+        self.profiles.clear()
+        self.armed.clear()
+
+    def to_dict(self):
+        return {
+            "timers": {name: histogram.to_dict() for name, histogram in self.timers.items()},
+            "counters": dict(self.counters),
+            "profiled": sorted(self.profiles),
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix="holdem"):
+        lines = [f"# TYPE {prefix}_phase_seconds histogram"]
+        for name, histogram in sorted(self.timers.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ["+Inf"], histogram.counts):
+                cumulative += count  # 프로메테우스 버킷은 누적 값
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {histogram.total}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {histogram.count}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def timed(name):
+    # HoldemGame 메서드용 데코레이터: self.instrumentation이 있으면 지연 시간을 기록
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if instrumentation is None:
+                return method(self, *args, **kwargs)
+            return instrumentation.call(name, method, self, *args, **kwargs)
+        return wrapper
+    return decorator
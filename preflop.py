@@ -0,0 +1,119 @@
+# 프리플랍 승률 테이블 생성기와 mmap 기반 조회기
+#
+# 슈트 대칭을 제거하면 시작 핸드는 169가지 클래스로 줄어든다 (페어 13, 수딧 78, 오프수딧 78).
+# 각 클래스의 1~9명의 무작위 상대에 대한 승리/무승부/에퀴티를 float32로 저장하고,
+# 실행 중에는 mmap으로 열어 오프셋 계산만으로 O(1) 조회한다.
+#
+# 사용법: python preflop.py [--trials N] [--seed S] [--output PATH]
+import argparse
+import mmap
+import os
+import struct
+
+
+PREFLOP_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.bin")
+MAX_OPPONENTS = 9  # 테이블에 저장하는 최대 상대 수
+NUM_CLASSES = 169  # 13 x 13 격자: 대각선은 페어, 위쪽은 수딧, 아래쪽은 오프수딧
+
+_MAGIC = b"PFEQ"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHHI")  # magic, version, 클래스 수, 최대 상대 수, 클래스당 시뮬레이션 수
+_ENTRY = struct.Struct("<3f")  # win, tie, equity (%)
+_SHORT_RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
+_tables = {}  # 경로 -> 공유 PreflopTable (테이블마다 mmap과 fd를 따로 잡지 않도록 프로세스에서 한 번만 엶)
+
+
+def hand_class(card1, card2):
+    # 두 장의 홀 카드를 0 ~ 168 사이의 클래스 인덱스로 변환
+    high, low = max(card1 >> 2, card2 >> 2), min(card1 >> 2, card2 >> 2)
+    if (card1 & 3) == (card2 & 3):
+        return high * 13 + low  # 수딧: 행 > 열
+    return low * 13 + high  # 페어(행 == 열) 또는 오프수딧(행 < 열)
+
+
+def hand_classes(first, second):
+    # hand_class의 배열 버전: (hands,) 카드 코드 배열 두 개 -> 시작 핸드 클래스
+    import numpy as np
+
+    high = np.maximum(first >> 2, second >> 2)
+    low = np.minimum(first >> 2, second >> 2)
+    return np.where((first & 3) == (second & 3), high * 13 + low, low * 13 + high)
+
+
+def class_cards(index):
+    # 클래스를 대표하는 홀 카드 두 장 (정수 코드)
+    row, col = divmod(index, 13)
+    if row > col:
+        return [row * 4, col * 4]  # 같은 슈트
+    return [row * 4, col * 4 + 1]  # 다른 슈트
+
+
+def class_name(index):
+    row, col = divmod(index, 13)
+    if row == col:
+        return _SHORT_RANKS[row] * 2
+    if row > col:
+        return f"{_SHORT_RANKS[row]}{_SHORT_RANKS[col]}s"
+    return f"{_SHORT_RANKS[col]}{_SHORT_RANKS[row]}o"
+
+
+class PreflopTable:
+    def __init__(self, path=PREFLOP_TABLE_PATH):
+        with open(path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)  # 파일을 메모리에 매핑
+        magic, version, classes, max_opponents, trials = _HEADER.unpack_from(self.buffer, 0)
+        if magic != _MAGIC or version != _VERSION or classes != NUM_CLASSES:
+            self.buffer.close()
+            raise ValueError(f"프리플랍 승률 테이블 형식이 올바르지 않습니다: {path}")
+        self.max_opponents = max_opponents
+        self.trials = trials
+
+    def lookup(self, card1, card2, opponents):
+        # (win, tie, equity) 백분율을 O(1)로 반환
+        if not 1 <= opponents <= self.max_opponents:
+            raise ValueError(f"상대 수는 1 ~ {self.max_opponents} 사이여야 합니다: {opponents}")
+        offset = _HEADER.size + (hand_class(card1, card2) * self.max_opponents + opponents - 1) * _ENTRY.size
+        return _ENTRY.unpack_from(self.buffer, offset)
+
+    def close(self):
+        self.buffer.close()
+
+
+def load_preflop_table(path=PREFLOP_TABLE_PATH):
+    # 경로마다 처음 부를 때만 열고 이후에는 같은 객체를 반환 (공유 객체이므로 호출한 쪽에서 close하지 않음)
+    table = _tables.get(path)
+    if table is None:
+        if not os.path.exists(path):
+            return None  # 테이블이 생성되지 않았으면 시뮬레이션으로 대체
+        table = _tables[path] = PreflopTable(path)
+    return table
+
+
+def generate(path=PREFLOP_TABLE_PATH, trials=50000, seed=None, max_opponents=MAX_OPPONENTS):
+    import numpy as np
+    from equity import random_opponent_equity
+
+    rng = np.random.default_rng(seed)
+    _tables.pop(path, None)  # 다시 만든 파일은 다음 load_preflop_table에서 새로 엶
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, NUM_CLASSES, max_opponents, trials))
+        for index in range(NUM_CLASSES):
+            equities = []
+            for opponents in range(1, max_opponents + 1):
+                result = random_opponent_equity(class_cards(index), opponents, trials, rng)
+                file.write(_ENTRY.pack(result.win[0], result.tie[0], result.equity[0]))
+                equities.append(result.equity[0])
+            print(f"{class_name(index):>4}: " + " ".join(f"{equity:5.1f}" for equity in equities))  # 진행 상황 출력
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프리플랍 승률 테이블 생성")
+    parser.add_argument("--trials", type=int, default=50000, help="클래스와 상대 수 조합당 시뮬레이션 수")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드")
+    parser.add_argument("--output", default=PREFLOP_TABLE_PATH, help="출력 파일 경로")
+    args = parser.parse_args()
+    generate(args.output, args.trials, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# 공유 보드 쇼다운 평가와 사이드 팟 분배
+#
+# 보드 5장의 랭크 키와 슈트별 랭크 마스크를 한 번만 계산해 두고, 좌석마다 홀 카드 두 장의 차이만 더해
+# 룩업 테이블을 조회한다. 보드에 같은 슈트가 3장 이상 없으면 플러시 검사 자체를 건너뛴다.
+# 평가 결과로 무승부를 포함한 전체 순위를 만들고, 좌석별 베팅 금액으로 메인 팟/사이드 팟을 나눠 분배한다.
+from evaluator import _RANK_BIT, _RANK_KEY, FLUSH_TABLE, POPCOUNT, RANK_TABLE
+
+
+class BoardProfile:
+    def __init__(self, board, hole_count=2):
+        self.key = 0  # 보드의 랭크 5진수 키
+        self.suit_masks = [0, 0, 0, 0]  # 보드의 슈트별 랭크 마스크
+        for card in board:
+            self.key += _RANK_KEY[card]
+            self.suit_masks[card & 3] |= _RANK_BIT[card]
+        # 홀 카드를 모두 더해도 5장이 안 되는 슈트는 플러시가 될 수 없음
+        self.flush_suits = [suit for suit in range(4) if POPCOUNT[self.suit_masks[suit]] + hole_count >= 5]
+
+    def evaluate(self, hole):
+        # 보드 프로필에 홀 카드만 더해 evaluate(hole + board)와 같은 강도를 반환
+        key = self.key
+        for card in hole:
+            key += _RANK_KEY[card]
+        for suit in self.flush_suits:
+            mask = self.suit_masks[suit]
+            for card in hole:
+                if card & 3 == suit:
+                    mask |= _RANK_BIT[card]
+            if FLUSH_TABLE[mask]:
+                return FLUSH_TABLE[mask]  # 7장 이하에서는 플러시가 있으면 풀하우스/포카드가 불가능
+        return RANK_TABLE[key]
+
+
+class HandState:
+    # 카드가 한 장씩 추가/제거될 때마다 랭크 개수 키와 슈트별 랭크 마스크만 갱신하는 증분 평가 상태
+    # (스트레이트는 랭크 개수 키로 RANK_TABLE에서, 플러시는 슈트 마스크로 FLUSH_TABLE에서 바로 판정)
+    def __init__(self, cards=()):
+        self.key = 0  # 랭크 개수의 5진수 키
+        self.suit_masks = [0, 0, 0, 0]  # 슈트별 랭크 마스크 (비트 수가 슈트별 카드 수)
+        for card in cards:
+            self.add(card)
+
+    def add(self, card):
+        self.key += _RANK_KEY[card]
+        self.suit_masks[card & 3] |= _RANK_BIT[card]
+
+    def remove(self, card):
+        self.key -= _RANK_KEY[card]
+        self.suit_masks[card & 3] &= ~_RANK_BIT[card]
+
+    def strength(self):
+        # 지금까지 더한 카드의 핸드 강도 (evaluate와 같은 값)
+        for mask in self.suit_masks:
+            if FLUSH_TABLE[mask]:
+                return FLUSH_TABLE[mask]
+        return RANK_TABLE[self.key]
+
+    def strength_with(self, cards):
+        # 상태를 바꾸지 않고 cards를 더했을 때의 강도 (시뮬레이션에서 남은 보드만 더할 때 사용)
+        key = self.key
+        suit_masks = list(self.suit_masks)
+        for card in cards:
+            key += _RANK_KEY[card]
+            suit_masks[card & 3] |= _RANK_BIT[card]
+        for mask in suit_masks:
+            if FLUSH_TABLE[mask]:
+                return FLUSH_TABLE[mask]
+        return RANK_TABLE[key]
+
+
+class Pot:
+    def __init__(self, amount, eligible):
+        self.amount = amount  # 팟 금액
+        self.eligible = eligible  # 이 팟을 가져갈 수 있는 좌석 (폴드하지 않았고 이 단계까지 베팅한 좌석)
+        self.winners = []  # 팟을 나눠 가진 좌석
+
+    def __repr__(self):
+        return f"Pot(amount={self.amount}, eligible={self.eligible}, winners={self.winners})"
+
+
+class ShowdownResult:
+    def __init__(self, strengths, ranking, pots, payouts):
+        self.strengths = strengths  # 좌석별 핸드 강도 (폴드한 좌석은 None)
+        self.ranking = ranking  # 강한 순서의 무승부 그룹 목록 [[좌석, ...], ...]
+        self.pots = pots  # 메인 팟부터 순서대로의 Pot 목록
+        self.payouts = payouts  # 좌석별 받은 금액
+
+    @property
+    def winners(self):
+        return self.ranking[0] if self.ranking else []  # 가장 강한 핸드의 좌석 (무승부면 여러 명)
+
+    def __repr__(self):
+        return f"ShowdownResult(ranking={self.ranking}, pots={self.pots}, payouts={self.payouts})"
+
+
+def rank_seats(strengths):
+    # 좌석별 강도 (None은 제외) -> 강한 순서의 무승부 그룹 목록
+    groups = {}
+    for seat, strength in enumerate(strengths):
+        if strength is not None:
+            groups.setdefault(strength, []).append(seat)
+    return [groups[strength] for strength in sorted(groups, reverse=True)]
+
+
+def build_pots(contributions, folded):
+    # 좌석별 베팅 합계를 단계별로 잘라 메인 팟과 사이드 팟으로 나눔
+    pots = []
+    carry = 0  # 가져갈 수 있는 좌석이 없는 단계의 금액 (모두 폴드한 좌석의 초과 베팅)
+    previous = 0
+    for level in sorted(set(amount for amount in contributions if amount > 0)):
+        amount = carry + sum(min(contribution, level) - min(contribution, previous) for contribution in contributions)
+        eligible = [seat for seat, contribution in enumerate(contributions)
+                    if contribution >= level and not folded[seat]]
+        previous = level
+        if not eligible:
+            carry = amount
+            continue
+        carry = 0
+        if pots and pots[-1].eligible == eligible:
+            pots[-1].amount += amount  # 가져갈 수 있는 좌석이 같으면 한 팟으로 합침
+        else:
+            pots.append(Pot(amount, eligible))
+    if carry and pots:
+        pots[-1].amount += carry
+    return pots
+
+
+def distribute(pots, strengths):
+    # 팟마다 자격 있는 좌석 중 가장 강한 핸드에게 분배 (나누어 떨어지지 않는 칩은 앞 좌석부터 한 개씩)
+    payouts = [0] * len(strengths)
+    for pot in pots:
+        best = max(strengths[seat] for seat in pot.eligible)
+        pot.winners = [seat for seat in pot.eligible if strengths[seat] == best]
+        share, remainder = divmod(pot.amount, len(pot.winners))
+        for i, seat in enumerate(pot.winners):
+            payouts[seat] += share + (1 if i < remainder else 0)
+    return payouts
+
+
+def showdown(hole_cards, board, contributions=None, folded=None):
+    # 좌석별 홀 카드와 공유 보드로 순위와 팟 분배를 계산
+    folded = folded if folded is not None else [False] * len(hole_cards)
+    contributions = contributions if contributions is not None else [0] * len(hole_cards)
+    profile = BoardProfile(board)
+    return settle([None if folded[seat] else profile.evaluate(hand) for seat, hand in enumerate(hole_cards)],
+                  contributions, folded)
+
+
+def settle(strengths, contributions, folded):
+    # 이미 계산한 좌석별 강도 (폴드한 좌석은 None)로 순위와 팟 분배를 계산
+    pots = build_pots(contributions, folded)
+    return ShowdownResult(strengths, rank_seats(strengths), pots, distribute(pots, strengths))
@@ -0,0 +1,142 @@
+# tkinter/PIL 없이 완전한 핸드를 대량으로 진행하는 헤드리스 시뮬레이션 엔진
+#
+# batch 엔진은 (hands x 52) 크기의 덱 버퍼(BatchDeck)를 미리 할당해 두고 매 배치마다 재사용하며,
+# 부분 Fisher-Yates로 뽑은 카드를 홀 카드와 보드로 나눠 한꺼번에 평가한다.
+# game 엔진은 HoldemGame을 직접 구동하여 GUI와 같은 경로로 핸드를 진행한다.
+#
+# 사용법: python simulate.py --hands 1000000 --players 6 --output stats.json
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from card import BatchDeck
+from equity import evaluate_cards, share_matrix
+from evaluator import CATEGORY_NAMES
+from game import HoldemGame
+from player import Player
+from preflop import NUM_CLASSES, class_name, hand_class, hand_classes
+
+BATCH_SIZE = 65536  # 한 번에 진행하는 핸드 수
+
+
+class HandStats:
+    def __init__(self):
+        self.hands = 0  # 진행한 핸드 수
+        self.category_counts = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)  # 쇼다운 족보별 빈도 (모든 좌석)
+        self.winning_category_counts = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)  # 승리한 핸드의 족보별 빈도
+        self.class_dealt = np.zeros(NUM_CLASSES, dtype=np.int64)  # 시작 핸드 클래스별 배분 횟수
+        self.class_wins = np.zeros(NUM_CLASSES)  # 시작 핸드 클래스별 획득한 팟 (무승부는 나눠 가짐)
+
+    def merge(self, other):
+        self.hands += other.hands
+        self.category_counts += other.category_counts
+        self.winning_category_counts += other.winning_category_counts
+        self.class_dealt += other.class_dealt
+        self.class_wins += other.class_wins
+
+    def to_dict(self):
+        return {
+            "hands": int(self.hands),
+            "category_frequencies": {name: int(count) for name, count in zip(CATEGORY_NAMES, self.category_counts)},
+            "winning_category_frequencies": {name: int(count)
+                                             for name, count in zip(CATEGORY_NAMES, self.winning_category_counts)},
+            "starting_hands": {
+                class_name(index): {
+                    "dealt": int(self.class_dealt[index]),
+                    "win_rate": float(self.class_wins[index] / self.class_dealt[index] * 100) if self.class_dealt[index] else 0.0,
+                }
+                for index in range(NUM_CLASSES)
+            },
+        }
+
+
+class BatchEngine:
+    def __init__(self, players, batch_size=BATCH_SIZE, seed=None):
+        self.players = players
+        self.batch_size = batch_size
+        self.deck = BatchDeck(range(52), batch_size, np.random.default_rng(seed))  # 배치마다 재사용하는 덱 버퍼
+        self.dealt = 2 * players + 5  # 핸드당 필요한 카드 수
+
+    def play(self, hands):
+        # hands개의 핸드를 배분 -> 플랍/턴/리버 -> 쇼다운까지 진행하고 통계를 반환
+        stats = HandStats()
+        while stats.hands < hands:
+            size = min(self.batch_size, hands - stats.hands)
+            cards = self.deck.draw(self.dealt, size)  # 부분 Fisher-Yates로 필요한 카드만 섞음
+            board = cards[:, 2 * self.players:]  # 플랍 3장, 턴, 리버
+
+            strengths = np.stack([evaluate_cards(np.concatenate([cards[:, 2 * seat:2 * seat + 2], board], axis=1))
+                                  for seat in range(self.players)])
+            _, _, shares = share_matrix(strengths)
+            categories = strengths >> 20
+            stats.category_counts += np.bincount(categories.ravel(), minlength=len(CATEGORY_NAMES))
+            stats.winning_category_counts += np.bincount(strengths.max(axis=0) >> 20, minlength=len(CATEGORY_NAMES))
+            for seat in range(self.players):
+                classes = hand_classes(cards[:, 2 * seat], cards[:, 2 * seat + 1])
+                stats.class_dealt += np.bincount(classes, minlength=NUM_CLASSES)
+                stats.class_wins += np.bincount(classes, weights=shares[seat], minlength=NUM_CLASSES)
+            stats.hands += size
+        return stats
+
+
+class GameEngine:
+    def __init__(self, players, seed=None):
+        random.seed(seed)  # Deck은 전역 random 상태를 사용
+        self.game = HoldemGame([Player(f"Player {seat + 1}") for seat in range(players)])
+
+    def play(self, hands):
+        stats = HandStats()
+        game = self.game
+        for _ in range(hands):
+            game.reset_game()
+            game.start_game()
+            game.reveal_flop()
+            game.reveal_turn()
+            game.reveal_river()
+            game.calculate_scores()
+            best = max(game.scores.values())
+            winners = [name for name, score in game.scores.items() if score == best]
+            stats.winning_category_counts[best >> 20] += 1
+            for player in game.players:
+                score = game.scores[player.name]
+                index = hand_class(player.hand[0], player.hand[1])
+                stats.category_counts[score >> 20] += 1
+                stats.class_dealt[index] += 1
+                if player.name in winners:
+                    stats.class_wins[index] += 1 / len(winners)
+            stats.hands += 1
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="헤드리스 홀덤 핸드 시뮬레이션")
+    parser.add_argument("--hands", type=int, default=1000000, help="진행할 핸드 수")
+    parser.add_argument("--players", type=int, default=2, help="테이블 인원 (2 ~ 10)")
+    parser.add_argument("--engine", choices=["batch", "game"], default="batch", help="시뮬레이션 엔진")
+    parser.add_argument("--seed", type=int, default=None, help="난수 시드")
+    parser.add_argument("--output", default=None, help="집계 통계를 저장할 JSON 파일")
+    args = parser.parse_args()
+    if not 2 <= args.players <= 10:
+        parser.error("테이블 인원은 2 ~ 10명이어야 합니다.")
+
+    engine = BatchEngine(args.players, seed=args.seed) if args.engine == "batch" else GameEngine(args.players, args.seed)
+    start = time.perf_counter()
+    stats = engine.play(args.hands)
+    elapsed = time.perf_counter() - start
+
+    print(f"{stats.hands} hands in {elapsed:.2f}s ({stats.hands / elapsed:,.0f} hands/s)")
+    for name, count in zip(CATEGORY_NAMES, stats.category_counts):
+        print(f"  {name:<16}{count / (stats.hands * args.players) * 100:7.3f}%")
+    if args.output:
+        result = stats.to_dict()
+        result.update({"players": args.players, "engine": args.engine, "seconds": elapsed,
+                       "hands_per_second": stats.hands / elapsed})
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
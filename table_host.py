@@ -0,0 +1,303 @@
+# asyncio 기반 멀티 테이블 호스트
+#
+# 한 프로세스에서 수천 개의 HoldemGame을 호스팅하며, 들어오는 행동(start/flop/turn/river/equity/showdown)에
+# 따라 테이블을 진행시킨다. 여러 테이블의 승률 계산과 쇼다운 평가는 짧은 시간 창 동안 모아서
+# 하나의 (행 x 7) 배열로 만든 뒤 벡터화 평가기를 한 번만 호출하고, 큰 배치는 프로세스 풀로 넘긴다.
+#
+# 사용법: python table_host.py --tables 1000 --hands 5 [--workers 4] [--unix /tmp/holdem.sock]
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from card import BatchDeck
+from equity import EXACT_THRESHOLD, count_runouts, evaluate_cards, tally
+from equity_cache import EquityCache
+from evaluator import describe
+from game import HoldemGame
+from player import Player
+from unix_server import LineJsonServer
+
+BATCH_WINDOW_MS = 2  # 평가 요청을 모으는 시간 창
+OFFLOAD_ROWS = 200000  # 평가할 행이 이 값 이상이면 프로세스 풀에서 실행
+EQUITY_TRIALS = 2000  # 전수 조사할 수 없는 상태에서 테이블당 시뮬레이션 수
+ACTIONS = ("start", "flop", "turn", "river", "equity", "showdown")
+
+
+def _request_rows(request):
+    # 요청을 평가할 때 evaluate_cards에 넘기는 행 수 (전수 조사면 실제 남은 보드 수, 아니면 시뮬레이션 수)
+    if request[0] == "showdown":
+        return len(request[1])
+    _, hole_cards, board, remaining, trials, _ = request
+    total = count_runouts(remaining, 5 - len(board))
+    return len(hole_cards) * (total if total <= EXACT_THRESHOLD else trials)
+
+
+def _equity_rows(hole_cards, board, remaining, trials, seed):
+    missing = 5 - len(board)
+    total = count_runouts(remaining, missing)
+    if total <= EXACT_THRESHOLD:
+        runouts = np.array(list(combinations(remaining, missing)), dtype=np.intp).reshape(total, missing)  # 전수 조사
+    else:
+        runouts = BatchDeck(remaining, trials, np.random.default_rng(seed)).draw(missing)
+    fixed = np.asarray(board, dtype=np.intp)
+    rows = [np.concatenate([np.broadcast_to(np.asarray(hand + board, dtype=np.intp), (len(runouts), 2 + len(fixed))),
+                            runouts], axis=1) for hand in hole_cards]
+    return np.concatenate(rows), len(runouts)
+
+
+def evaluate_requests(requests):
+    # 여러 테이블의 요청을 한 번의 evaluate_cards 호출로 처리 (워커 프로세스에서도 실행 가능하도록 정수만 사용)
+    # requests: [("showdown", hole_cards, board) | ("equity", hole_cards, board, remaining, trials, seed)]
+    blocks = []
+    layouts = []
+    for request in requests:
+        if request[0] == "showdown":
+            _, hole_cards, board = request
+            blocks.append(np.array([hand + board for hand in hole_cards], dtype=np.intp))
+            layouts.append((len(hole_cards), 1))
+        else:
+            _, hole_cards, board, remaining, trials, seed = request
+            rows, runouts = _equity_rows(hole_cards, board, remaining, trials, seed)
+            blocks.append(rows)
+            layouts.append((len(hole_cards), runouts))
+    strengths = evaluate_cards(np.concatenate(blocks)) if blocks else np.empty(0, dtype=np.int64)
+
+    results = []
+    offset = 0
+    for request, (seats, runouts) in zip(requests, layouts):
+        block = strengths[offset:offset + seats * runouts].reshape(seats, runouts)
+        offset += seats * runouts
+        if request[0] == "showdown":
+            results.append(block[:, 0].tolist())
+        else:
+            wins, ties, shares = tally(block)
+            results.append({"win": (wins / runouts * 100).tolist(), "tie": (ties / runouts * 100).tolist(),
+                            "equity": (shares / runouts * 100).tolist(), "trials": runouts})
+    return results
+
+
+class TableStats:
+    def __init__(self):
+        self.actions = 0
+        self.total = 0.0  # 누적 지연 시간 (초)
+        self.max = 0.0
+
+    def observe(self, elapsed):
+        self.actions += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+
+class TableHost:
+    def __init__(self, tables, players_per_table=2, workers=0, batch_window_ms=BATCH_WINDOW_MS,
+                 offload_rows=OFFLOAD_ROWS, equity_trials=EQUITY_TRIALS):
+        self.equity_cache = EquityCache()  # 모든 테이블이 공유하는 승률 캐시
+        self.tables = [HoldemGame([Player(f"Seat {seat + 1}") for seat in range(players_per_table)],
+                                  equity_cache=self.equity_cache) for _ in range(tables)]
+        self.stats = [TableStats() for _ in range(tables)]
+        # fork로 만든 워커는 소켓 fd를 물려받아 연결 종료(EOF)를 막으므로 spawn으로 띄운다
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) \
+            if workers else None
+        self.batch_window = batch_window_ms / 1000
+        self.offload_rows = offload_rows
+        self.equity_trials = equity_trials
+        self.pending = []  # (요청, future) 목록
+        self.flush_task = None
+        self.batches = 0  # 평가기 호출 횟수
+        self.started = time.perf_counter()
+
+    async def act(self, table_id, action):
+        start = time.perf_counter()
+        try:
+            return await self._act(self.tables[table_id], action)
+        finally:
+            self.stats[table_id].observe(time.perf_counter() - start)
+
+    async def _act(self, game, action):
+        if action == "start":
+            game.reset_game()
+            game.start_game()
+            return {"state": game.state, "hands": [player.hand for player in game.players]}
+        if action in ("flop", "turn", "river"):
+            getattr(game, f"reveal_{action}")()
+            return {"state": game.state, "board": game.table_cards}
+        if action == "equity":
+            key = game.equity_cache_key("host", self.equity_trials)
+            result = self.equity_cache.get(key)
+            if result is None:
+                result = await self._submit(("equity", [list(player.hand) for player in game.players],
+                                             list(game.table_cards), game.deck.cards, self.equity_trials,
+                                             int.from_bytes(os.urandom(4), "little")))
+                self.equity_cache.put(key, result)
+            return result
+        if action == "showdown":
+            if game.state != "river":
+                raise Exception("쇼다운은 리버를 공개한 뒤에만 할 수 있습니다.")
+            seats = [seat for seat, player in enumerate(game.players) if not player.folded]
+            strengths = await self._submit(("showdown", [list(game.players[seat].hand) for seat in seats],
+                                            list(game.table_cards)))
+            best = max(strengths)
+            for seat, strength in zip(seats, strengths):
+                game.scores[game.players[seat].name] = strength
+            winners = [game.players[seat].name for seat, strength in zip(seats, strengths) if strength == best]
+            return {"winners": winners, "hand": describe(best)}
+        raise ValueError(f"알 수 없는 행동입니다: {action}")
+
+    def _submit(self, request):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((request, future))
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self._flush_later())  # 시간 창이 끝나면 한꺼번에 평가
+        return future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_window)
+        pending, self.pending, self.flush_task = self.pending, [], None
+        requests = [request for request, _ in pending]
+        rows = sum(_request_rows(request) for request in requests)
+        try:
+            if self.executor is not None and rows >= self.offload_rows:
+                results = await asyncio.get_running_loop().run_in_executor(self.executor, evaluate_requests, requests)
+            else:
+                results = evaluate_requests(requests)
+        except Exception as error:
+            for _, future in pending:
+                future.set_exception(error)
+            return
+        self.batches += 1
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
+
+    def report(self):
+        actions = sum(stats.actions for stats in self.stats)
+        elapsed = time.perf_counter() - self.started
+        means = np.array([stats.total / stats.actions for stats in self.stats if stats.actions]) * 1000
+        return {
+            "tables": len(self.tables),
+            "actions": actions,
+            "seconds": elapsed,
+            "actions_per_second": actions / elapsed if elapsed else 0.0,
+            "evaluator_batches": self.batches,
+            "table_latency_ms": {
+                "mean_p50": float(np.percentile(means, 50)) if len(means) else 0.0,
+                "mean_p99": float(np.percentile(means, 99)) if len(means) else 0.0,
+                "max": max(stats.max for stats in self.stats) * 1000,
+            },
+            "equity_cache": self.equity_cache.stats(),
+        }
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+class LocalClient:
+    # 같은 프로세스에서 호스트를 직접 호출하는 클라이언트
+    def __init__(self, host):
+        self.host = host
+
+    async def act(self, table_id, action):
+        return await self.host.act(table_id, action)
+
+    async def close(self):
+        pass
+
+
+class UnixServer(LineJsonServer):
+    # 줄 단위 JSON 프로토콜: {"id", "table", "action"} -> {"id", "result"} 또는 {"id", "error"}
+    def __init__(self, host):
+        super().__init__(self._act)
+        self.host = host
+
+    async def _act(self, message):
+        return await self.host.act(message["table"], message["action"])
+
+
+class UnixClient:
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.waiting = {}  # 요청 id -> future
+        self.next_id = 0
+        self.receiver = None
+
+    async def connect(self, path):
+        self.reader, self.writer = await asyncio.open_unix_connection(path, limit=2 ** 20)
+        self.receiver = asyncio.ensure_future(self._receive())
+        return self
+
+    async def _receive(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            future = self.waiting.pop(reply["id"])
+            if "error" in reply:
+                future.set_exception(Exception(reply["error"]))
+            else:
+                future.set_result(reply["result"])
+
+    async def act(self, table_id, action):
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        self.writer.write((json.dumps({"id": self.next_id, "table": table_id, "action": action}) + "\n").encode())
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.receiver  # 서버가 연결을 닫으면 수신 태스크도 끝남
+
+
+async def play_hands(client, table_id, hands):
+    for _ in range(hands):
+        await client.act(table_id, "start")
+        await client.act(table_id, "equity")
+        for street in ("flop", "turn", "river"):
+            await client.act(table_id, street)
+            await client.act(table_id, "equity")
+        await client.act(table_id, "showdown")
+
+
+async def load_test(tables, hands, players, workers, unix_path=None):
+    host = TableHost(tables, players, workers)
+    server = None
+    if unix_path:
+        server = await UnixServer(host).start(unix_path)
+        client = await UnixClient().connect(unix_path)
+    else:
+        client = LocalClient(host)
+    host.started = time.perf_counter()
+    await asyncio.gather(*(play_hands(client, table_id, hands) for table_id in range(tables)))
+    report = host.report()
+    await client.close()
+    if server is not None:
+        await server.close()
+        os.unlink(unix_path)
+    host.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio 멀티 테이블 호스트 부하 테스트")
+    parser.add_argument("--tables", type=int, default=1000, help="동시에 진행할 테이블 수")
+    parser.add_argument("--hands", type=int, default=5, help="테이블당 진행할 핸드 수")
+    parser.add_argument("--players", type=int, default=2, help="테이블당 인원")
+    parser.add_argument("--workers", type=int, default=0, help="큰 배치를 처리할 프로세스 수 (0이면 사용 안 함)")
+    parser.add_argument("--unix", default=None, help="유닉스 소켓 경로 (지정하면 소켓 클라이언트로 테스트)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(load_test(args.tables, args.hands, args.players, args.workers, args.unix)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import random
+import unittest
+
+from equity import exact_equity
+from game import HoldemGame
+from icm import all_in_equity
+from player import Player
+
+
+def make_game(players=2):
+    return HoldemGame([Player(f"Player {seat + 1}") for seat in range(players)])
+
+
+class PreflopTableTest(unittest.TestCase):
+    def test_games_share_one_table(self):
+        first, second = make_game(), make_game(3)
+        self.assertIsNotNone(first.preflop_table)
+        self.assertIs(first.preflop_table, second.preflop_table)
+
+
+
+class IcmEquityTest(unittest.TestCase):
+    def test_folded_seat_is_dead_in_all_in(self):
+        random.seed(3)
+        game = make_game(3)
+        game.start_game()
+        game.reveal_flop()
+        game.fold(1)
+        stacks = {"Player 1": 100, "Player 2": 100, "Player 3": 100}
+        result = game.calculate_icm_equity(stacks, [50, 30, 20])
+        # 폴드한 좌석을 빼고 헤즈업으로 전수 조사한 에퀴티로 가중한 값과 같아야 함
+        showdown = exact_equity([game.players[0].hand, game.players[2].hand], game.table_cards, game.deck.cards)
+        expected = all_in_equity([100, 100, 100], [50, 30, 20], [0, 2], showdown.equity)
+        for seat, player in enumerate(game.players):
+            self.assertAlmostEqual(result[player.name], expected[seat])
+        self.assertAlmostEqual(sum(result.values()), 100)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# 줄 단위 JSON 유닉스 도메인 소켓 서버
+#
+# 요청 한 줄마다 태스크를 만들어 한 연결에서도 여러 요청을 동시에 처리하고, 응답은 끝나는 순서대로 보낸다.
+# 응답은 요청의 id를 그대로 담아 {"id", "result"} 또는 {"id", "error"}로 돌려준다.
+# table_host.UnixServer와 equity_service.EquityServer가 요청 처리 함수만 바꿔 공유한다.
+import asyncio
+import json
+import os
+
+
+class LineJsonServer:
+    def __init__(self, handle):
+        self.handle = handle  # 요청 dict -> JSON으로 보낼 수 있는 결과를 돌려주는 코루틴 함수
+        self.server = None
+        self.connections = set()  # 연결별 처리 태스크
+
+    async def start(self, path):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = await asyncio.start_unix_server(self._handle, path=path, limit=2 ** 20)
+        return self
+
+    async def _handle(self, reader, writer):
+        self.connections.add(asyncio.current_task())
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._respond(line, writer))  # 한 연결에서 여러 요청을 동시에 처리
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+            self.connections.discard(asyncio.current_task())
+
+    async def _respond(self, line, writer):
+        message = {}
+        try:
+            message = json.loads(line)
+            reply = {"id": message.get("id"), "result": await self.handle(message)}
+        except Exception as error:
+            reply = {"id": message.get("id"), "error": str(error)}
+        writer.write((json.dumps(reply) + "\n").encode())
+
+    async def close(self):
+        self.server.close()
+        if self.connections:
+            await asyncio.gather(*self.connections)  # 클라이언트가 연결을 끊을 때까지 대기
+        await self.server.wait_closed()